@@ -25,13 +25,13 @@ if is_cloud:
 else:
     from state_management import initialize_state, get_state
 
-from utils.layout import setup_page_config, render_navigation_sidebar, render_progress_indicator
+from utils.layout import initialize_layout, render_navigation_sidebar, render_progress_indicator
 
 
 def main():
     """Main application entry point."""
-    # Setup
-    setup_page_config()
+    # Setup: page config plus the app stylesheet, emitted once per run
+    initialize_layout()
     initialize_state()
     
     # Get current state
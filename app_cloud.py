@@ -21,14 +21,14 @@ else:
     from state_management import initialize_state, get_state
     logger.info("Running in local mode - using disk-based session management")
 
-from utils.layout import setup_page_config, render_navigation_sidebar, render_progress_indicator
+from utils.layout import initialize_layout, render_navigation_sidebar, render_progress_indicator
 
 
 def main():
     """Main application entry point - Cloud optimized."""
     try:
-        # Setup page config
-        setup_page_config()
+        # Setup page config and the app stylesheet
+        initialize_layout()
         
         # Get configuration
         railway_config = get_railway_config()
@@ -8,7 +8,7 @@ from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
 import streamlit as st
 import pandas as pd
-import uuid
+import secrets
 import json
 from datetime import datetime
 import logging
@@ -26,7 +26,7 @@ class CloudAppState:
     """Cloud-optimized application state using dataclass."""
     
     # Session Management - Cloud Optimized
-    session_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    session_id: str = field(default_factory=lambda: secrets.token_hex(16))
     session_created: str = field(default_factory=lambda: datetime.now().isoformat())
     last_updated: str = field(default_factory=lambda: datetime.now().isoformat())
     cloud_mode: bool = True  # Flag for cloud deployment
@@ -5,12 +5,24 @@ State transitions and control flow logic for the application.
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
 from typing import Any, Optional
 from datetime import datetime
 import io
 import os
 from io import BytesIO
 from state_management import get_state, update_state, add_data_checkpoint, update_stage_progress
+from railway_config import get_railway_config
+
+
+# Header words that mark a column as holding company names, with the plural and
+# run-together forms whole-word matching would otherwise miss
+COMPANY_COLUMN_KEYWORDS = frozenset({
+    'name', 'names', 'company', 'companies', 'consignee', 'consignees',
+    'business', 'businesses', 'customer', 'customers', 'client', 'clients',
+    'vendor', 'vendors', 'companyname', 'consigneename', 'businessname',
+    'customername', 'clientname', 'vendorname'
+})
 
 
 def go_to_stage(stage_name: str) -> None:
@@ -58,11 +70,17 @@ def can_proceed_to_analyze() -> bool:
 
 def handle_file_upload(uploaded_file: Any) -> bool:
     """Enhanced file upload workflow with XLSX support, sheet selection, and duplicate removal."""
-    from utils.data_utils import clean_dataframe_for_arrow
+    from utils.data_utils import clean_dataframe_for_arrow, convert_to_arrow_strings, to_arrow_preview
     
     if uploaded_file is None:
         return False
     
+    # Reject oversized uploads before spending any time parsing them
+    max_file_size_mb = get_railway_config().get_config()['max_file_size_mb']
+    if uploaded_file.size > max_file_size_mb * 1024 * 1024:
+        st.error(f"❌ File is {uploaded_file.size / (1024 * 1024):.1f}MB; the limit for this deployment is {max_file_size_mb}MB.")
+        return False
+    
     try:
         # Try to import preprocessor, fallback to basic loading if not available
         try:
@@ -76,9 +94,13 @@ def handle_file_upload(uploaded_file: Any) -> bool:
         file_bytes = uploaded_file.getvalue()
         filename = uploaded_file.name
         
+        # Sniff the content signature rather than trusting the extension
+        from services.data_loader import detect_file_type
+        is_excel = detect_file_type(file_bytes, filename) == 'excel'
+        
         # Check if we need to handle Excel sheet selection
         selected_sheet = None
-        if use_preprocessing and filename.lower().endswith('.xlsx'):
+        if use_preprocessing and is_excel:
             # Check if this is a sheet selection scenario
             if f"sheet_selection_{uploaded_file.name}" in st.session_state:
                 selected_sheet = st.session_state[f"sheet_selection_{uploaded_file.name}"]
@@ -152,13 +174,13 @@ def handle_file_upload(uploaded_file: Any) -> bool:
             # FALLBACK PATH: Basic CSV loading (original functionality)
             st.info("📄 Loading file using basic method...")
             
-            if filename.lower().endswith('.xlsx'):
+            if is_excel:
                 st.error("❌ Excel files require the preprocessing module. Please ensure all dependencies are installed.")
                 return False
             
             # Import here to avoid circular imports
-            from services.data_loader import load_csv
-            df = load_csv(file_bytes)
+            from services.data_loader import load_and_clean
+            df = load_and_clean(file_bytes, filename)
             
             if df.empty:
                 st.error("Uploaded file is empty or could not be processed")
@@ -169,8 +191,12 @@ def handle_file_upload(uploaded_file: Any) -> bool:
             st.error("No data available after processing")
             return False
         
-        # Additional cleaning for safety
-        cleaned_df = clean_dataframe_for_arrow(df)
+        if use_preprocessing:
+            # Preprocessed frames still need Arrow cleaning, then Arrow-backed strings for fast filtering
+            cleaned_df = convert_to_arrow_strings(clean_dataframe_for_arrow(df))
+        else:
+            # load_and_clean already returns Arrow-cleaned frames
+            cleaned_df = df
         
         # Validate dataframe before saving
         if len(cleaned_df.columns) == 0:
@@ -205,7 +231,7 @@ def handle_file_upload(uploaded_file: Any) -> bool:
             
             # Show detailed summary
             show_preprocessing_summary(df, cleaned_df, 
-                                     "xlsx" if filename.lower().endswith('.xlsx') else "csv")
+                                     "xlsx" if is_excel else "csv")
             
             if selected_sheet:
                 st.info(f"📊 Processed sheet: '{selected_sheet}'")
@@ -214,7 +240,7 @@ def handle_file_upload(uploaded_file: Any) -> bool:
             
             # Show sample of processed data
             with st.expander("👀 Preview Processed Data"):
-                st.dataframe(cleaned_df.head(10), use_container_width=True)
+                st.dataframe(to_arrow_preview(cleaned_df, 10), use_container_width=True)
         else:
             # Basic success message
             st.success(f"✅ File loaded successfully! Dataset: {len(cleaned_df)} rows × {len(cleaned_df.columns)} columns")
@@ -239,15 +265,12 @@ def initialize_session_on_upload(df: pd.DataFrame) -> None:
         # CRITICAL FIX: Preserve existing email status data if it exists in the uploaded CSV
         preserved_df = preserve_email_status_from_csv(df)
         
-        # Set original dataframe as backup with preserved email status
-        update_state(original_dataframe=preserved_df.copy())
+        # The original backup gets its own copy so in-place writes to working data can't reach it
+        update_state(original_dataframe=preserved_df.copy(), working_data=preserved_df)
         
         # Create initial data checkpoint
         add_data_checkpoint("File uploaded with email status preserved", preserved_df)
         
-        # Initialize working data with preserved email status
-        update_state(working_data=preserved_df.copy())
-        
         # FIXED: Only reset stage progress if this is truly a new upload
         # Check if we're reloading the same file with email status
         if has_email_status_columns(df):
@@ -338,15 +361,22 @@ def save_filtered_data_to_session(filtered_df: pd.DataFrame) -> bool:
     Returns:
         bool: Success status
     """
+    from utils.data_utils import dataframe_fingerprint
+    
     try:
         state = get_state()
         
         # Update working data with filtered data
-        update_state(working_data=filtered_df.copy())
+        update_state(working_data=filtered_df)
+        
+        # Same rows as the last save: skip the checkpoint and the CSV write
+        fingerprint = dataframe_fingerprint(filtered_df)
+        unchanged = fingerprint is not None and st.session_state.get('saved_data_fingerprint') == fingerprint
         
         # Create data checkpoint
         filter_description = create_filter_description()
-        add_data_checkpoint(f"Data filtered: {filter_description}", filtered_df)
+        if not unchanged:
+            add_data_checkpoint(f"Data filtered: {filter_description}", filtered_df)
         
         # Save filters applied
         filters_applied = {
@@ -362,7 +392,8 @@ def save_filtered_data_to_session(filtered_df: pd.DataFrame) -> bool:
         update_state(filters_applied=filters_applied)
         
         # Save session data to file system for persistence
-        save_session_data_to_file(filtered_df, "filtered_data")
+        if not unchanged and save_session_data_to_file(filtered_df, "filtered_data"):
+            st.session_state.saved_data_fingerprint = fingerprint
         
         return True
         
@@ -447,14 +478,14 @@ def proceed_to_web_research() -> None:
                               (bool(state.primary_filter_values) or bool(state.secondary_filter_values)))
         
         # CRITICAL: Set working_data to the display dataframe
-        update_state(working_data=display_df.copy())
+        update_state(working_data=display_df)
         
-        # ENHANCED: Update session state for cross-stage consistency
-        st.session_state.working_data = display_df.copy()
+        # ENHANCED: Update session state for cross-stage consistency (same frame, no copy)
+        st.session_state.working_data = display_df
         
         # If using filtered data, also preserve the filtered dataframe
         if using_filtered_data:
-            st.session_state.filtered_data_for_research = display_df.copy()
+            st.session_state.filtered_data_for_research = display_df
             st.session_state.research_uses_filtered_data = True
             
             # Add filter info to session
@@ -509,15 +540,9 @@ def proceed_to_web_research() -> None:
 
 def find_company_columns(df: pd.DataFrame) -> list:
     """Helper function to identify potential company name columns."""
-    company_keywords = ['name', 'company', 'consignee', 'business', 'customer', 'client', 'vendor']
-    potential_columns = []
-    
-    for col in df.columns:
-        col_lower = col.lower()
-        if any(keyword in col_lower for keyword in company_keywords):
-            potential_columns.append(col)
+    from utils.data_utils import column_tokens
     
-    return potential_columns
+    return [col for col in df.columns if COMPANY_COLUMN_KEYWORDS & column_tokens(col)]
 
 
 def apply_filters_enhanced():
@@ -531,8 +556,8 @@ def apply_filters_enhanced():
         # CRITICAL: Update working data to match filtered view
         display_df = get_display_dataframe()
         if display_df is not None:
-            update_state(working_data=display_df.copy())
-            st.session_state.working_data = display_df.copy()
+            update_state(working_data=display_df)
+            st.session_state.working_data = display_df
         
         return True
         
@@ -613,6 +638,22 @@ def reset_app() -> None:
     st.rerun()
 
 
+def _filter_mask(series: pd.Series, values: list) -> pd.Series:
+    """Boolean mask of rows whose value, compared as a string, is in the filter values."""
+    filter_values_str = [str(v) for v in values]
+    
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Match the categories once, then look each row up by its code (-1 marks missing)
+        category_matches = np.append(series.cat.categories.astype(str).isin(filter_values_str), False)
+        return pd.Series(category_matches[series.cat.codes.to_numpy()], index=series.index)
+    
+    if isinstance(series.dtype, pd.StringDtype):
+        return series.isin(filter_values_str)
+    
+    # Convert to string for safe comparison
+    return series.astype(str).isin(filter_values_str)
+
+
 def apply_filters() -> None:
     """Apply current filters to the main dataframe and update filtered_dataframe."""
     from utils.data_utils import clean_dataframe_for_arrow
@@ -622,26 +663,24 @@ def apply_filters() -> None:
     if state.main_dataframe is None:
         return
     
-    df = state.main_dataframe.copy()
+    df = state.main_dataframe
     
-    # Apply primary filter
-    if state.primary_filter_column and state.primary_filter_values:
-        if state.primary_filter_column in df.columns:
-            # Convert to string for safe comparison
-            df_col_str = df[state.primary_filter_column].astype(str)
-            filter_values_str = [str(v) for v in state.primary_filter_values]
-            df = df[df_col_str.isin(filter_values_str)]
+    # Combine primary and secondary filters into one mask; only the masked rows get materialized
+    mask = None
+    for column, values in ((state.primary_filter_column, state.primary_filter_values),
+                           (state.secondary_filter_column, state.secondary_filter_values)):
+        if column and values and column in df.columns:
+            column_mask = _filter_mask(df[column], values)
+            mask = column_mask if mask is None else mask & column_mask
     
-    # Apply secondary filter
-    if state.secondary_filter_column and state.secondary_filter_values:
-        if state.secondary_filter_column in df.columns:
-            # Convert to string for safe comparison
-            df_col_str = df[state.secondary_filter_column].astype(str)
-            filter_values_str = [str(v) for v in state.secondary_filter_values]
-            df = df[df_col_str.isin(filter_values_str)]
+    # Count retained rows straight from the mask; when nothing is dropped, reuse the
+    # main frame, which was already cleaned on upload
+    if mask is None or np.count_nonzero(mask.to_numpy()) == len(df):
+        update_state(filtered_dataframe=df)
+        return
     
     # Clean the filtered dataframe for Arrow compatibility
-    cleaned_df = clean_dataframe_for_arrow(df)
+    cleaned_df = clean_dataframe_for_arrow(df[mask])
     
     # Update filtered dataframe
     update_state(filtered_dataframe=cleaned_df)
@@ -820,6 +859,11 @@ def preserve_email_status_from_csv(df: pd.DataFrame) -> pd.DataFrame:
                     lambda x: str(x).lower() in ['true', '1', 'yes', 'y'] if pd.notna(x) else False
                 )
             
+            # Workflow columns get new values written later; keep them out of the category dtype
+            for col in ['email_status', 'sent_date', 'campaign_name']:
+                if col in preserved_df.columns and isinstance(preserved_df[col].dtype, pd.CategoricalDtype):
+                    preserved_df[col] = preserved_df[col].astype(object)
+            
             if 'email_status' in preserved_df.columns:
                 # Fill empty status with 'Not Sent'
                 preserved_df['email_status'] = preserved_df['email_status'].fillna('Not Sent')
@@ -847,12 +891,13 @@ def preserve_email_status_from_csv(df: pd.DataFrame) -> pd.DataFrame:
         
     except Exception as e:
         st.warning(f"⚠️ Error preserving email status: {str(e)}")
-        # Return original dataframe with default columns
-        df['email_selected'] = False
-        df['email_status'] = 'Not Sent'
-        df['sent_date'] = ''
-        df['campaign_name'] = ''
-        return df
+        # Return a copy of the original dataframe with default columns
+        fallback_df = df.copy()
+        fallback_df['email_selected'] = False
+        fallback_df['email_status'] = 'Not Sent'
+        fallback_df['sent_date'] = ''
+        fallback_df['campaign_name'] = ''
+        return fallback_df
 
 
 def has_email_status_columns(df: pd.DataFrame) -> bool:
@@ -917,6 +962,9 @@ def sync_email_status_to_enhanced_data(enhanced_data: pd.DataFrame, csv_data: pd
         if enhanced_data is None or csv_data is None:
             return enhanced_data
         
+        # Write into a copy; the caller's frame may be shared with other session slots
+        enhanced_data = enhanced_data.copy()
+        
         # Add email status columns to enhanced data if they don't exist
         email_columns = ['email_selected', 'email_status', 'sent_date', 'campaign_name']
         for col in email_columns:
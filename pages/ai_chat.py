@@ -5,24 +5,35 @@ Basic AI chat interface page.
 """
 
 import streamlit as st
+from controllers import go_to_stage
+
+# Optional pieces: resolved once at import instead of on every rerun
+try:
+    from utils.layout import render_header
+except ImportError:
+    render_header = None
+
+try:
+    from cloud_state_management import get_state, get_main_dataframe
+except ImportError:
+    get_state = get_main_dataframe = None
 
 
 def render():
     """Render the AI chat page."""
-    from utils.layout import render_header
-    from utils.winwood_styling import apply_winwood_theme
-    
-    apply_winwood_theme()
-    render_header("🤖 AI Chat", "Chat with AI about your business data")
+    if render_header is not None:
+        render_header("🤖 AI Chat", "Chat with AI about your business data")
+    else:
+        st.title("🤖 AI Chat")
+        st.markdown("Chat with AI about your business data")
     
     # Check if data is loaded
-    try:
-        from cloud_state_management import get_state, get_main_dataframe
+    if get_state is not None:
         state = get_state()
         df = get_main_dataframe()
         data_loaded = state.data_loaded and df is not None
         filename = state.uploaded_filename
-    except ImportError:
+    else:
         # Fallback
         data_loaded = st.session_state.get('data_loaded', False)
         df = st.session_state.get('uploaded_data')
@@ -31,7 +42,6 @@ def render():
     if not data_loaded or df is None:
         st.warning("⚠️ No data loaded. Please upload data first.")
         if st.button("← Go to Upload"):
-            from controllers import go_to_stage
             go_to_stage("upload")
         return
     
@@ -63,15 +73,12 @@ def render():
     
     with col1:
         if st.button("← Upload", use_container_width=True):
-            from controllers import go_to_stage
             go_to_stage("upload")
     
     with col2:
         if st.button("📊 Visualizations", use_container_width=True):
-            from controllers import go_to_stage
             go_to_stage("visualizations")
     
     with col3:
         if st.button("Business Research →", use_container_width=True):
-            from controllers import go_to_stage
             go_to_stage("map")
\ No newline at end of file
@@ -9,7 +9,14 @@ import pandas as pd
 import time
 import random
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Optional
+from utils.data_utils import to_arrow_preview
+from utils.layout import navigate_to_stage
+
+
+# Pre-built timber sample used when no data has been uploaded
+SAMPLE_DATA_PATH = Path(__file__).resolve().parent.parent / "assets" / "sample_timber.parquet"
 
 
 def enhanced_business_research_page():
@@ -121,30 +128,12 @@ def enhanced_business_research_page():
         
         with col1:
             if st.button("← Go to Upload", use_container_width=True):
-                try:
-                    from controllers import go_to_stage
-                    go_to_stage('upload')
-                except:
-                    if 'current_stage' in st.session_state:
-                        st.session_state.current_stage = 'upload'
-                    st.rerun()
+                navigate_to_stage('upload')
         
         with col2:
             # Create sample data for testing
             if st.button("🧪 Use Sample Data", use_container_width=True):
-                sample_data = pd.DataFrame({
-                    'Consignee Name': [
-                        'Acme Timber Corporation',
-                        'Global Wood Solutions',
-                        'Teakwood Trading Inc',
-                        'Premium Lumber LLC',
-                        'Forest Products Co'
-                    ],
-                    'Product': ['Teak Wood', 'Plywood', 'Timber Logs', 'Lumber', 'Wood Panels'],
-                    'Quantity': [100, 200, 150, 300, 75],
-                    'Value': [10000, 25000, 18000, 45000, 8500],
-                    'Consignee City': ['Mumbai', 'Delhi', 'Chennai', 'Bangalore', 'Kolkata']
-                })
+                sample_data = pd.read_parquet(SAMPLE_DATA_PATH, memory_map=True)
                 
                 st.session_state.working_data = sample_data
                 st.success("✅ Sample timber business data loaded!")
@@ -164,10 +153,9 @@ def enhanced_business_research_page():
     
     if not company_column:
         # Use first string column
-        for col in data.columns:
-            if data[col].dtype == 'object':
-                company_column = col
-                break
+        text_columns = data.select_dtypes(include=['object', 'string', 'category']).columns
+        if len(text_columns) > 0:
+            company_column = text_columns[0]
     
     # Find city column
     city_column = None
@@ -177,13 +165,18 @@ def enhanced_business_research_page():
             break
     
     if company_column:
+        from services.web_scraper import ResearchResultsManager
+        
+        # Distinct companies, ignoring case and surrounding spaces
+        company_targets = ResearchResultsManager.unique_targets(data, company_column)
+        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.metric("Total Records", len(data))
         
         with col2:
-            unique_companies = data[company_column].nunique()
+            unique_companies = len(company_targets)
             st.metric("Unique Companies", unique_companies)
         
         with col3:
@@ -196,7 +189,7 @@ def enhanced_business_research_page():
         
         # Show data preview
         with st.expander("📋 Data Preview", expanded=False):
-            st.dataframe(data.head(10), use_container_width=True)
+            st.dataframe(to_arrow_preview(data, 10), use_container_width=True)
         
         # Research Configuration
         st.subheader("⚙️ Research Configuration")
@@ -206,8 +199,6 @@ def enhanced_business_research_page():
         with col1:
             batch_size = st.slider("Batch Size", 1, 10, 3, 
                                  help="Number of companies to research at once")
-            search_delay = st.slider("Search Delay (seconds)", 1.0, 5.0, 2.0, 
-                                   help="Delay between searches")
         
         with col2:
             enable_government_search = st.checkbox("Enable Government Sources", value=True)
@@ -226,9 +217,13 @@ def enhanced_business_research_page():
         st.subheader("🚀 AI Research Execution")
         
         # Get companies to research
-        all_companies = data[company_column].dropna().unique().tolist()
-        researched_companies = set(st.session_state.research_results.keys())
-        pending_companies = [c for c in all_companies if c not in researched_companies]
+        researched_companies = set(ResearchResultsManager.normalize_company_names(
+            pd.Series(list(st.session_state.research_results.keys()), dtype=object)
+        ))
+        pending_companies = [
+            company for normalized, company in company_targets.items()
+            if normalized not in researched_companies
+        ]
         
         col1, col2 = st.columns(2)
         
@@ -249,7 +244,6 @@ def enhanced_business_research_page():
         with col2:
             st.info(f"⚙️ **Configuration**:")
             st.write(f"• Batch size: {batch_size}")
-            st.write(f"• Search delay: {search_delay}s")
             st.write(f"• Government search: {'✅' if enable_government_search else '❌'}")
             st.write(f"• Industry search: {'✅' if enable_industry_search else '❌'}")
         
@@ -258,7 +252,6 @@ def enhanced_business_research_page():
             if st.button("🔍 Start AI Research", type="primary", use_container_width=True):
                 perform_batch_research(
                     pending_companies[:batch_size], 
-                    search_delay, 
                     city_column, 
                     data, 
                     company_column
@@ -362,36 +355,21 @@ def enhanced_business_research_page():
     
     with col1:
         if st.button("← Upload", use_container_width=True):
-            try:
-                from controllers import go_to_stage
-                go_to_stage('upload')
-            except:
-                st.session_state.current_stage = 'upload'
-                st.rerun()
+            navigate_to_stage('upload')
     
     with col2:
         if st.button("📊 Visualizations", use_container_width=True):
-            try:
-                from controllers import go_to_stage
-                go_to_stage('visualizations')
-            except:
-                st.session_state.current_stage = 'visualizations'
-                st.rerun()
+            navigate_to_stage('visualizations')
     
     with col3:
         if st.session_state.research_results:
             if st.button("Email Outreach →", type="primary", use_container_width=True):
-                try:
-                    from controllers import go_to_stage
-                    go_to_stage('analyze')
-                except:
-                    st.session_state.current_stage = 'analyze'
-                    st.rerun()
+                navigate_to_stage('analyze')
         else:
             st.button("Complete Research First", disabled=True, use_container_width=True)
 
 
-def perform_batch_research(companies: List[str], delay: float, city_column: Optional[str], 
+def perform_batch_research(companies: List[str], city_column: Optional[str], 
                           data: pd.DataFrame, company_column: str):
     """Perform batch research on companies."""
     
@@ -402,45 +380,37 @@ def perform_batch_research(companies: List[str], delay: float, city_column: Opti
         from services.web_scraper import WebScraper
         scraper = WebScraper()
         
-        for i, company in enumerate(companies):
-            # Update progress
-            progress = (i + 1) / len(companies)
-            progress_bar.progress(progress, text=f"Researching {company}...")
-            status_text.info(f"🔍 Researching: {company}")
-            
-            # Get city context if available
+        # Pair each company with its city context if available
+        targets = []
+        for company in companies:
             expected_city = None
             if city_column:
                 try:
                     city_data = data[data[company_column] == company][city_column]
                     expected_city = city_data.iloc[0] if len(city_data) > 0 else None
-                except:
+                except (KeyError, IndexError):
                     pass
-            
-            # Perform research
-            try:
-                result = scraper.research_company_contacts(company, expected_city)
-                st.session_state.research_results[company] = result
-                
-                # Show live results
-                if result['status'] == 'found':
-                    contacts = result.get('contacts', [])
-                    email = contacts[0]['email'] if contacts else 'No email'
-                    status_text.success(f"✅ Found: {company} | Email: {email}")
-                else:
-                    status_text.warning(f"⚠️ Limited data: {company}")
-                
-            except Exception as e:
-                st.session_state.research_results[company] = {
-                    'status': 'error',
-                    'contacts': [],
-                    'description': f"Research error: {str(e)}",
-                    'confidence_score': 0.0
-                }
-                status_text.error(f"❌ Error: {company}")
-            
-            # Delay between requests
-            time.sleep(delay)
+            targets.append((company, expected_city))
+        
+        done = 0
+        
+        def show_result(company: str, result: Dict):
+            # Update progress and show live results as each company finishes
+            nonlocal done
+            done += 1
+            progress_bar.progress(done / len(companies), text=f"Researched {company}")
+            if result['status'] == 'found':
+                contacts = result.get('contacts', [])
+                email = contacts[0]['email'] if contacts else 'No email'
+                status_text.success(f"✅ Found: {company} | Email: {email}")
+            else:
+                status_text.warning(f"⚠️ Limited data: {company}")
+        
+        status_text.info(f"🔍 Researching {len(companies)} companies concurrently...")
+        
+        # Searches run concurrently; failures come back as error results per company
+        results = scraper.research_many_sync(targets, on_result=show_result)
+        st.session_state.research_results.update(results)
     
     except Exception as e:
         st.error(f"❌ Research error: {e}")
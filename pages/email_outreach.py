@@ -6,24 +6,45 @@ Email campaign management and outreach functionality.
 
 import streamlit as st
 import pandas as pd
+from utils.data_utils import column_tokens, to_arrow_preview
+from controllers import go_to_stage
+
+# Optional pieces: resolved once at import instead of on every rerun
+try:
+    from utils.layout import render_header
+except ImportError:
+    render_header = None
+
+try:
+    from cloud_state_management import get_state, get_main_dataframe
+except ImportError:
+    get_state = get_main_dataframe = None
+
+
+# Header words used to spot contact and company columns, with the plural and
+# run-together forms whole-word matching would otherwise miss
+EMAIL_KEYWORDS = frozenset({
+    'email', 'emails', 'mail', 'mails', 'contact', 'contacts',
+    'emailid', 'emailaddress', 'mailid'
+})
+COMPANY_KEYWORDS = frozenset({'company', 'companies', 'name', 'names', 'companyname'})
 
 
 def render():
     """Render the email outreach page."""
-    from utils.layout import render_header
-    from utils.winwood_styling import apply_winwood_theme
-    
-    apply_winwood_theme()
-    render_header("📧 Email Outreach", "Manage email campaigns and outreach")
+    if render_header is not None:
+        render_header("📧 Email Outreach", "Manage email campaigns and outreach")
+    else:
+        st.title("📧 Email Outreach")
+        st.markdown("Manage email campaigns and outreach")
     
     # Check if data is loaded
-    try:
-        from cloud_state_management import get_state, get_main_dataframe
+    if get_state is not None:
         state = get_state()
         df = get_main_dataframe()
         data_loaded = state.data_loaded and df is not None
         filename = state.uploaded_filename
-    except ImportError:
+    else:
         # Fallback
         data_loaded = st.session_state.get('data_loaded', False)
         df = st.session_state.get('uploaded_data')
@@ -32,7 +53,6 @@ def render():
     if not data_loaded or df is None:
         st.warning("⚠️ No data loaded. Please upload data first.")
         if st.button("← Go to Upload"):
-            from controllers import go_to_stage
             go_to_stage("upload")
         return
     
@@ -61,8 +81,15 @@ def render():
     # Target selection
     st.subheader("🎯 Target Selection")
     
-    # Find email columns
-    email_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['email', 'mail', 'contact'])]
+    # Classify email and company columns in a single pass over the headers
+    email_cols = []
+    company_cols = []
+    for col in df.columns:
+        tokens = column_tokens(col)
+        if tokens & EMAIL_KEYWORDS:
+            email_cols.append(col)
+        if tokens & COMPANY_KEYWORDS:
+            company_cols.append(col)
     
     if email_cols:
         selected_email_col = st.selectbox("Select email column:", email_cols)
@@ -75,8 +102,8 @@ def render():
             # Preview targets
             if len(email_data) > 0:
                 st.subheader("📋 Target Preview")
-                target_preview = df[[col for col in df.columns if col in ['Company', 'Name', selected_email_col] or 'company' in col.lower() or 'name' in col.lower()]]
-                st.dataframe(target_preview.head(10), use_container_width=True)
+                target_preview = df[[col for col in df.columns if col == selected_email_col or col in company_cols]]
+                st.dataframe(to_arrow_preview(target_preview, 10), use_container_width=True)
     else:
         st.warning("No email columns found in the data. Please ensure your data includes email addresses.")
     
@@ -134,15 +161,12 @@ def render():
     
     with col1:
         if st.button("← Business Research", use_container_width=True):
-            from controllers import go_to_stage
             go_to_stage("map")
     
     with col2:
         if st.button("📊 Visualizations", use_container_width=True):
-            from controllers import go_to_stage
             go_to_stage("visualizations")
     
     with col3:
         if st.button("📁 Upload New Data", use_container_width=True):
-            from controllers import go_to_stage
             go_to_stage("upload")
\ No newline at end of file
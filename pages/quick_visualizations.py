@@ -7,24 +7,35 @@ Basic data visualization page.
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from controllers import go_to_stage
+
+# Optional pieces: resolved once at import instead of on every rerun
+try:
+    from utils.layout import render_header
+except ImportError:
+    render_header = None
+
+try:
+    from cloud_state_management import get_state, get_main_dataframe
+except ImportError:
+    get_state = get_main_dataframe = None
 
 
 def render():
     """Render the visualizations page."""
-    from utils.layout import render_header
-    from utils.winwood_styling import apply_winwood_theme
-    
-    apply_winwood_theme()
-    render_header("📊 Quick Visualizations", "Explore your data with interactive charts")
+    if render_header is not None:
+        render_header("📊 Quick Visualizations", "Explore your data with interactive charts")
+    else:
+        st.title("📊 Quick Visualizations")
+        st.markdown("Explore your data with interactive charts")
     
     # Check if data is loaded
-    try:
-        from cloud_state_management import get_state, get_main_dataframe
+    if get_state is not None:
         state = get_state()
         df = get_main_dataframe()
         data_loaded = state.data_loaded and df is not None
         filename = state.uploaded_filename
-    except ImportError:
+    else:
         # Fallback
         data_loaded = st.session_state.get('data_loaded', False)
         df = st.session_state.get('uploaded_data')
@@ -33,7 +44,6 @@ def render():
     if not data_loaded or df is None:
         st.warning("⚠️ No data loaded. Please upload data first.")
         if st.button("← Go to Upload"):
-            from controllers import go_to_stage
             go_to_stage("upload")
         return
     
@@ -51,7 +61,7 @@ def render():
     
     with col2:
         numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        text_cols = df.select_dtypes(include=['object']).columns.tolist()
+        text_cols = df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
         st.metric("Numeric Columns", len(numeric_cols))
         st.metric("Text Columns", len(text_cols))
     
@@ -106,15 +116,12 @@ def render():
     
     with col1:
         if st.button("← AI Chat", use_container_width=True):
-            from controllers import go_to_stage
             go_to_stage("ai_chat")
     
     with col2:
         if st.button("🗺️ Business Research", use_container_width=True):
-            from controllers import go_to_stage
             go_to_stage("map")
     
     with col3:
         if st.button("Email Outreach →", use_container_width=True):
-            from controllers import go_to_stage
             go_to_stage("analyze")
\ No newline at end of file
@@ -6,28 +6,45 @@ Configuration and utilities for Railway cloud deployment.
 
 import os
 import streamlit as st
+from functools import cached_property
 from typing import Dict, Any
 
 
+# Environment variables Railway sets on every deployment
+RAILWAY_INDICATORS = frozenset({
+    'RAILWAY_ENVIRONMENT',
+    'RAILWAY_PROJECT_ID',
+    'RAILWAY_SERVICE_ID',
+    'RAILWAY_REPLICA_ID'
+})
+
+
 class RailwayConfig:
     """Railway-specific configuration management."""
     
-    def __init__(self):
-        self.is_railway = self.detect_railway()
-        self.environment = self.get_environment()
-        self.memory_limit = self.get_memory_limit()
-        self.storage_strategy = "memory" if self.is_railway else "disk"
+    @cached_property
+    def is_railway(self) -> bool:
+        """Whether the app is running on Railway (resolved once)."""
+        return self.detect_railway()
+    
+    @cached_property
+    def environment(self) -> str:
+        """Deployment environment name (resolved once)."""
+        return self.get_environment()
+    
+    @cached_property
+    def memory_limit(self) -> int:
+        """Memory limit in MB (resolved once)."""
+        return self.get_memory_limit()
+    
+    @cached_property
+    def storage_strategy(self) -> str:
+        """Where session data is kept (resolved once)."""
+        return "memory" if self.is_railway else "disk"
     
     def detect_railway(self) -> bool:
         """Detect if running on Railway."""
-        railway_indicators = [
-            'RAILWAY_ENVIRONMENT',
-            'RAILWAY_PROJECT_ID',
-            'RAILWAY_SERVICE_ID',
-            'RAILWAY_REPLICA_ID'
-        ]
-        
-        return any(env_var in os.environ for env_var in railway_indicators)
+        return bool(RAILWAY_INDICATORS & os.environ.keys())
     
     def get_environment(self) -> str:
         """Get deployment environment."""
@@ -9,19 +9,72 @@ import streamlit as st
 import pandas as pd
 import os
 import json
-import uuid
+import secrets
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, Tuple, List
 import tempfile
 import logging
 from pathlib import Path
 import hashlib
+import heapq
+import gc
+from contextlib import contextmanager, nullcontext
 import io
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
+try:
+    from utils.data_utils import convert_to_arrow_strings
+except ImportError:
+    def convert_to_arrow_strings(df):
+        return df
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Minimum interval between expired-session sweeps
+SWEEP_INTERVAL_SECONDS = 60
+
+# Rows per write when falling back to pandas for CSV export
+EXPORT_CSV_CHUNK_ROWS = 100_000
+
+# Deleting more dataframes than this at once defers garbage collection to a single pass
+GC_BATCH_THRESHOLD = 8
+
+
+# ISO timestamp of the current second, reused until the second changes
+_last_ts_int = 0
+_last_ts_str = ""
+
+
+def _now_iso() -> str:
+    """Current local time as an ISO string, formatted at most once per second."""
+    global _last_ts_int, _last_ts_str
+    now = int(time.time())
+    if now != _last_ts_int:
+        _last_ts_str = datetime.fromtimestamp(now).isoformat()
+        _last_ts_int = now
+    return _last_ts_str
+
+
+@contextmanager
+def _deferred_gc():
+    """Pause automatic garbage collection for a bulk delete, then collect once."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+        gc.collect()
+
 
 class CloudSessionManager:
     """
@@ -29,6 +82,9 @@ class CloudSessionManager:
     and handles ephemeral storage limitations.
     """
     
+    # Prefix of every session_state key holding a stored dataframe
+    DF_KEY_PREFIX = "df_"
+    
     def __init__(self):
         # Use system temp directory for cloud compatibility
         self.base_temp_dir = tempfile.gettempdir()
@@ -40,28 +96,35 @@ class CloudSessionManager:
         # Session limits for cloud deployment
         self.max_sessions = 10  # Limit concurrent sessions
         self.session_timeout = timedelta(hours=2)  # Auto-cleanup after 2 hours
+        self._timeout_seconds = self.session_timeout.total_seconds()
         self.max_file_size_mb = 50  # Max file size to store
         
+        self._ensure_session_state()
+    
+    def _ensure_session_state(self):
+        """Initialize the per-browser-session storage keys if missing."""
         # In-memory storage for active sessions
         if 'cloud_session_data' not in st.session_state:
             st.session_state.cloud_session_data = {}
         
-        # Initialize cleanup
-        self._cleanup_old_sessions()
+        # Min-heap of (monotonic access time, session_id); superseded entries are skipped lazily
+        if 'cloud_session_lru' not in st.session_state:
+            st.session_state.cloud_session_lru = []
     
     def create_session(self, session_id: Optional[str] = None) -> str:
         """Create a new cloud-optimized session."""
         if session_id is None:
-            session_id = str(uuid.uuid4())
+            session_id = secrets.token_hex(16)
         
-        # Cleanup old sessions if limit exceeded
+        # Sweep expired sessions, then cleanup old sessions if limit exceeded
+        self._cleanup_old_sessions()
         self._enforce_session_limits()
         
         # Create session metadata
         session_data = {
             'session_id': session_id,
-            'created_at': datetime.now().isoformat(),
-            'last_accessed': datetime.now().isoformat(),
+            'created_at': _now_iso(),
+            'last_accessed': _now_iso(),
             'data_stored_in_memory': True,
             'file_count': 0,
             'total_size_mb': 0
@@ -69,6 +132,7 @@ class CloudSessionManager:
         
         # Store in memory instead of disk
         st.session_state.cloud_session_data[session_id] = session_data
+        self._touch(session_id, session_data)
         
         logger.info(f"Created cloud session: {session_id}")
         return session_id
@@ -76,24 +140,31 @@ class CloudSessionManager:
     def store_dataframe(self, session_id: str, df: pd.DataFrame, name: str = "main_data") -> bool:
         """Store dataframe in memory with size limits."""
         try:
-            # Check dataframe size
-            size_mb = df.memory_usage(deep=True).sum() / (1024 * 1024)
+            # Frames stay resident for the session, so hold text as Arrow strings
+            df = convert_to_arrow_strings(df)
+            
+            # Check dataframe size of the compacted form
+            size_mb = self._dataframe_size_mb(df)
             
             if size_mb > self.max_file_size_mb:
                 logger.warning(f"DataFrame too large: {size_mb:.1f}MB > {self.max_file_size_mb}MB")
                 return False
             
             # Store in session state instead of disk
+            self._cleanup_old_sessions()
             if session_id not in st.session_state.cloud_session_data:
                 self.create_session(session_id)
             
             # Store dataframe in memory
-            session_key = f"df_{session_id}_{name}"
-            st.session_state[session_key] = df.copy()
+            # Keep a reference; loads hand out shallow views instead of copies
+            session_key = self._df_key(session_id, name)
+            st.session_state[session_key] = df
             
-            # Update session metadata
+            # Update session metadata and the index of this session's frames
             session_data = st.session_state.cloud_session_data[session_id]
-            session_data['last_accessed'] = datetime.now().isoformat()
+            session_data.setdefault('_df_keys', set()).add(session_key)
+            session_data['last_accessed'] = _now_iso()
+            self._touch(session_id, session_data)
             session_data['file_count'] = session_data.get('file_count', 0) + 1
             session_data['total_size_mb'] = session_data.get('total_size_mb', 0) + size_mb
             
@@ -104,19 +175,37 @@ class CloudSessionManager:
             logger.error(f"Error storing dataframe: {e}")
             return False
     
-    def load_dataframe(self, session_id: str, name: str = "main_data") -> Optional[pd.DataFrame]:
-        """Load dataframe from memory."""
+    def _dataframe_size_mb(self, df: pd.DataFrame) -> float:
+        """Size of a dataframe in MB, paying for a deep scan only when it can matter."""
+        has_text = any(dtype == object or dtype == 'string' for dtype in df.dtypes.values)
+        if has_text:
+            # Shallow usage is a lower bound; only measure strings near the limit
+            rough_mb = df.shape[0] * df.shape[1] * 8 / (1024 * 1024)
+            if rough_mb > 0.5 * self.max_file_size_mb:
+                return df.memory_usage(deep=True).sum() / (1024 * 1024)
+        return df.memory_usage(deep=False).sum() / (1024 * 1024)
+    
+    def load_dataframe(self, session_id: str, name: str = "main_data",
+                       mutate: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Load dataframe from memory.
+
+        The stored frame is shared, so by default a shallow copy is returned:
+        callers may add or replace columns but must not modify values in place.
+        Pass ``mutate=True`` to get an independent deep copy.
+        """
         try:
-            session_key = f"df_{session_id}_{name}"
+            df = self._get_dataframe_no_copy(session_id, name)
             
-            if session_key in st.session_state:
+            if df is not None:
                 # Update last accessed time
-                if session_id in st.session_state.cloud_session_data:
-                    st.session_state.cloud_session_data[session_id]['last_accessed'] = datetime.now().isoformat()
+                session_data = st.session_state.cloud_session_data.get(session_id)
+                if session_data is not None:
+                    session_data['last_accessed'] = _now_iso()
+                    self._touch(session_id, session_data)
                 
-                df = st.session_state[session_key]
                 logger.info(f"Loaded DataFrame '{name}' for session {session_id}")
-                return df.copy()
+                return df.copy(deep=mutate)
             
             return None
             
@@ -124,6 +213,14 @@ class CloudSessionManager:
             logger.error(f"Error loading dataframe: {e}")
             return None
     
+    def _df_key(self, session_id: str, name: str) -> str:
+        """session_state key for a stored dataframe."""
+        return f"{self.DF_KEY_PREFIX}{session_id}_{name}"
+    
+    def _get_dataframe_no_copy(self, session_id: str, name: str) -> Optional[pd.DataFrame]:
+        """Return the stored dataframe itself, for internal read-only access."""
+        return st.session_state.get(self._df_key(session_id, name))
+    
     def store_session_metadata(self, session_id: str, metadata: Dict[str, Any]) -> bool:
         """Store session metadata in memory."""
         try:
@@ -133,7 +230,8 @@ class CloudSessionManager:
             # Merge with existing metadata
             session_data = st.session_state.cloud_session_data[session_id]
             session_data.update(metadata)
-            session_data['last_accessed'] = datetime.now().isoformat()
+            session_data['last_accessed'] = _now_iso()
+            self._touch(session_id, session_data)
             
             return True
             
@@ -150,14 +248,13 @@ class CloudSessionManager:
     def create_export_file(self, session_id: str, df: pd.DataFrame, filename: str) -> Optional[io.BytesIO]:
         """Create export file in memory instead of disk."""
         try:
-            # Create in-memory file
             buffer = io.BytesIO()
             
             # Export based on file extension
             if filename.endswith('.csv'):
-                df.to_csv(buffer, index=False)
+                self._write_csv(df, buffer)
             elif filename.endswith('.xlsx'):
-                df.to_excel(buffer, index=False, engine='openpyxl')
+                df.to_excel(buffer, index=False, engine='xlsxwriter')
             else:
                 logger.error(f"Unsupported export format: {filename}")
                 return None
@@ -170,21 +267,31 @@ class CloudSessionManager:
             logger.error(f"Error creating export file: {e}")
             return None
     
+    def _write_csv(self, df: pd.DataFrame, buffer: io.BytesIO) -> None:
+        """Write CSV with Arrow's C++ writer, falling back to chunked pandas output."""
+        if pa is not None:
+            try:
+                pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buffer)
+                return
+            except (TypeError, ValueError, pa.ArrowException) as e:
+                # Mixed-type object columns cannot be converted to Arrow
+                logger.info(f"Arrow CSV export unavailable, using pandas: {e}")
+                buffer.seek(0)
+                buffer.truncate(0)
+        
+        df.to_csv(buffer, index=False, chunksize=EXPORT_CSV_CHUNK_ROWS)
+    
     def cleanup_session(self, session_id: str) -> bool:
         """Clean up a specific session from memory."""
         try:
             # Remove session data
-            if session_id in st.session_state.cloud_session_data:
-                del st.session_state.cloud_session_data[session_id]
+            session_data = st.session_state.cloud_session_data.pop(session_id, {})
             
-            # Remove dataframes
-            keys_to_remove = []
-            for key in st.session_state.keys():
-                if key.startswith(f"df_{session_id}_"):
-                    keys_to_remove.append(key)
-            
-            for key in keys_to_remove:
-                del st.session_state[key]
+            # Remove dataframes tracked for this session
+            df_keys = session_data.get('_df_keys', ())
+            with _deferred_gc() if len(df_keys) > GC_BATCH_THRESHOLD else nullcontext():
+                for key in df_keys:
+                    st.session_state.pop(key, None)
             
             logger.info(f"Cleaned up session: {session_id}")
             return True
@@ -194,15 +301,19 @@ class CloudSessionManager:
             return False
     
     def _cleanup_old_sessions(self):
-        """Clean up expired sessions."""
+        """Clean up expired sessions, at most once per SWEEP_INTERVAL_SECONDS."""
         try:
-            current_time = datetime.now()
-            sessions_to_remove = []
+            now_mono = time.monotonic()
+            if now_mono - st.session_state.setdefault('_last_sweep_ts', 0.0) < SWEEP_INTERVAL_SECONDS:
+                return
+            st.session_state['_last_sweep_ts'] = now_mono
             
-            for session_id, session_data in st.session_state.cloud_session_data.items():
-                last_accessed = datetime.fromisoformat(session_data['last_accessed'])
-                if current_time - last_accessed > self.session_timeout:
-                    sessions_to_remove.append(session_id)
+            now_ts = time.time()
+            sessions_to_remove = [
+                session_id
+                for session_id, session_data in st.session_state.cloud_session_data.items()
+                if now_ts - session_data['last_accessed_ts'] > self._timeout_seconds
+            ]
             
             for session_id in sessions_to_remove:
                 self.cleanup_session(session_id)
@@ -211,17 +322,43 @@ class CloudSessionManager:
         except Exception as e:
             logger.error(f"Error during session cleanup: {e}")
     
+    def _touch(self, session_id: str, session_data: Dict[str, Any]) -> None:
+        """Record an access for expiry and LRU ordering without rewriting older heap entries."""
+        session_data['last_accessed_ts'] = time.time()
+        now = time.monotonic()
+        session_data['_lru_ts'] = now
+        lru = st.session_state.cloud_session_lru
+        heapq.heappush(lru, (now, session_id))
+        
+        # Rebuild from live entries once superseded ones dominate the heap
+        if len(lru) > 4 * self.max_sessions:
+            lru[:] = [
+                (data['_lru_ts'], sid)
+                for sid, data in st.session_state.cloud_session_data.items()
+                if '_lru_ts' in data
+            ]
+            heapq.heapify(lru)
+    
+    def _pop_least_recent(self) -> Optional[str]:
+        """Pop the least recently accessed live session id from the LRU heap."""
+        sessions = st.session_state.cloud_session_data
+        lru = st.session_state.cloud_session_lru
+        while lru:
+            accessed, session_id = heapq.heappop(lru)
+            session_data = sessions.get(session_id)
+            if session_data is not None and session_data.get('_lru_ts') == accessed:
+                return session_id
+        return None
+    
     def _enforce_session_limits(self):
         """Enforce maximum session limits."""
         try:
             if len(st.session_state.cloud_session_data) >= self.max_sessions:
-                # Remove oldest session
-                oldest_session = min(
-                    st.session_state.cloud_session_data.items(),
-                    key=lambda x: x[1]['last_accessed']
-                )
-                self.cleanup_session(oldest_session[0])
-                logger.info(f"Removed oldest session to enforce limits: {oldest_session[0]}")
+                # Remove least recently accessed session
+                oldest_session = self._pop_least_recent()
+                if oldest_session is not None:
+                    self.cleanup_session(oldest_session)
+                    logger.info(f"Removed oldest session to enforce limits: {oldest_session}")
                 
         except Exception as e:
             logger.error(f"Error enforcing session limits: {e}")
@@ -245,13 +382,13 @@ class CloudSessionManager:
                 )
                 stats['total_memory_mb'] = round(total_size, 2)
                 
-                # Find oldest and newest sessions
-                sessions_by_time = sorted(
-                    st.session_state.cloud_session_data.items(),
-                    key=lambda x: x[1]['created_at']
-                )
-                stats['oldest_session'] = sessions_by_time[0][1]['created_at']
-                stats['newest_session'] = sessions_by_time[-1][1]['created_at']
+                # Find oldest and newest sessions (ISO strings order chronologically)
+                created_times = [
+                    session_data['created_at']
+                    for session_data in st.session_state.cloud_session_data.values()
+                ]
+                stats['oldest_session'] = min(created_times)
+                stats['newest_session'] = max(created_times)
             
             return stats
             
@@ -262,17 +399,18 @@ class CloudSessionManager:
     def force_cleanup_all(self):
         """Force cleanup of all sessions - use with caution."""
         try:
-            # Clear all cloud session data
+            # Collect every tracked dataframe key before clearing session data
+            keys_to_remove = set()
+            for session_data in st.session_state.cloud_session_data.values():
+                keys_to_remove.update(session_data.get('_df_keys', ()))
+            
             st.session_state.cloud_session_data = {}
+            st.session_state.cloud_session_lru = []
             
             # Clear all dataframes
-            keys_to_remove = []
-            for key in st.session_state.keys():
-                if key.startswith('df_'):
-                    keys_to_remove.append(key)
-            
-            for key in keys_to_remove:
-                del st.session_state[key]
+            with _deferred_gc():
+                for key in keys_to_remove:
+                    st.session_state.pop(key, None)
             
             logger.info("Force cleanup completed - all sessions cleared")
             
@@ -280,10 +418,16 @@ class CloudSessionManager:
             logger.error(f"Error during force cleanup: {e}")
 
 
-# Global instance
-cloud_session_manager = CloudSessionManager()
+# Global instance, created on first use
+_cloud_session_manager = None
 
 
 def get_cloud_session_manager() -> CloudSessionManager:
     """Get the global cloud session manager instance."""
-    return cloud_session_manager
+    global _cloud_session_manager
+    if _cloud_session_manager is None:
+        _cloud_session_manager = CloudSessionManager()
+    else:
+        # The instance is shared; storage keys live in each browser session
+        _cloud_session_manager._ensure_session_state()
+    return _cloud_session_manager
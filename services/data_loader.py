@@ -3,21 +3,54 @@ Enhanced Data Loader Service
 ===========================
 Data loading, parsing, and persistence with session management.
 STAGE 2: Session Management System Integration
+
+DataFrames saved to and loaded from session state are shared, not copied:
+treat them as read-only and copy before modifying values in place.
 """
 import pandas as pd
 import streamlit as st
+from pandas.api.types import union_categoricals
 from io import BytesIO
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List
 import os
+import hashlib
 from datetime import datetime
 
 # Import from utils.data_utils if available, otherwise provide fallback
 try:
-    from utils.data_utils import clean_dataframe_for_arrow
+    from utils.data_utils import clean_dataframe_for_arrow, convert_to_arrow_strings
 except ImportError:
-    def clean_dataframe_for_arrow(df):
+    def clean_dataframe_for_arrow(df, inplace=False):
+        return df
+    def convert_to_arrow_strings(df):
         return df
 
+# Leading bytes of Excel files: zip container (.xlsx) and OLE2 compound document (.xls)
+EXCEL_SIGNATURES = (b'PK\x03\x04', b'\xd0\xcf\x11\xe0')
+
+# Railway's memory budget only has room for one cached upload
+try:
+    from railway_config import is_cloud_deployment
+    UPLOAD_CACHE_ENTRIES = 1 if is_cloud_deployment() else 2
+except ImportError:
+    UPLOAD_CACHE_ENTRIES = 2
+
+# Rust-based Excel reader; pandas >= 2.2 exposes it as engine='calamine'
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None
+
+# Encoding sniffing for CSV uploads; without it UTF-8 is assumed
+try:
+    from charset_normalizer import from_bytes as detect_charset
+except ImportError:
+    detect_charset = None
+
+# Bytes sniffed to guess a CSV's encoding
+ENCODING_SAMPLE_BYTES = 65536
+
 # Import from state_management if available, otherwise provide fallback
 try:
     from state_management import add_data_checkpoint, update_stage_progress
@@ -28,89 +61,230 @@ except ImportError:
         pass
 
 
-@st.cache_data(show_spinner="Loading CSV...")
-def load_csv(file_bytes: bytes) -> pd.DataFrame:
-    """Load CSV data from uploaded bytes. Cached for speed."""
+# Rows per chunk when streaming large uploads into memory
+CHUNK_SIZE = 50_000
+
+# Rows sampled up front to pick narrower dtypes for the full read
+DTYPE_SAMPLE_ROWS = 500
+
+# Text columns with fewer unique values than this share of rows become categoricals
+CATEGORY_RATIO = 0.05
+
+# After loading, large frames also categorize text columns below this unique-value share
+CATEGORY_MAX_RATIO = 0.5
+CATEGORY_MIN_ROWS = 10_000
+
+
+def _infer_dtype_map(sample: pd.DataFrame) -> Dict[str, str]:
+    """Map low-cardinality text columns of a sample to the category dtype."""
+    if sample.empty:
+        return {}
+    
+    unique_counts = sample.select_dtypes(include='object').nunique()
+    low_cardinality = unique_counts[(unique_counts > 0) & (unique_counts / len(sample) < CATEGORY_RATIO)]
+    return {col: 'category' for col in low_cardinality.index}
+
+
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate chunks, keeping categorical columns categorical."""
+    if len(chunks) == 1:
+        return chunks[0]
+    
+    # pd.concat falls back to object when chunk categories differ, so align them first
+    for col in chunks[0].select_dtypes(include='category').columns:
+        categories = union_categoricals([chunk[col] for chunk in chunks], sort_categories=True).categories
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    
+    return pd.concat(chunks, ignore_index=True, copy=False)
+
+
+def _downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcast int64/float64 columns to the smallest dtype that holds their values."""
+    for col in df.select_dtypes(include='integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in df.select_dtypes(include='float').columns:
+        # to_numeric's float downcast rounds silently; only keep float32 when it is lossless
+        narrowed = df[col].astype('float32')
+        if narrowed.astype('float64').equals(df[col]):
+            df[col] = narrowed
+    return df
+
+
+def _categorize_low_cardinality(df: pd.DataFrame) -> pd.DataFrame:
+    """Store repetitive text columns of large frames as categoricals."""
+    if len(df) <= CATEGORY_MIN_ROWS:
+        # Small frames gain little and would still pay for nunique()
+        return df
+    
+    for col in df.select_dtypes(include='object').columns:
+        unique_count = df[col].nunique(dropna=False)
+        if unique_count and unique_count / len(df) < CATEGORY_MAX_RATIO:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def _read_csv_chunked(file_bytes: bytes, encoding: str) -> pd.DataFrame:
+    """Read CSV bytes in fixed-size chunks with narrowed dtypes and concatenate once."""
+    sample = pd.read_csv(BytesIO(file_bytes), encoding=encoding, nrows=DTYPE_SAMPLE_ROWS)
+    dtype_map = _infer_dtype_map(sample)
+    
+    if len(sample) < DTYPE_SAMPLE_ROWS:
+        # The sample already holds the whole file
+        df = sample.astype(dtype_map) if dtype_map else sample
+        return _downcast_numeric(df)
+    
+    reader = pd.read_csv(BytesIO(file_bytes), encoding=encoding, dtype=dtype_map, chunksize=CHUNK_SIZE)
+    with reader:
+        chunks = list(reader)
+    
+    return _downcast_numeric(_concat_chunks(chunks))
+
+
+def _read_excel_streaming(file_io: BytesIO, sheet_name: Optional[str] = None) -> pd.DataFrame:
+    """Stream an Excel sheet row by row with openpyxl's read-only mode."""
+    from openpyxl import load_workbook
+    
+    workbook = load_workbook(file_io, read_only=True, data_only=True)
     try:
-        # Try different encodings if UTF-8 fails
-        encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                # Convert bytes to BytesIO for pandas
-                file_io = BytesIO(file_bytes)
-                df = pd.read_csv(file_io, encoding=encoding)
-                break
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                if encoding == encodings[-1]:  # Last encoding attempt
-                    raise e
-                continue
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
         
-        if df is None:
-            raise ValueError("Could not decode file with any supported encoding")
-        
-        # Basic validation
-        if df.empty:
-            st.warning("CSV file is empty")
-            return pd.DataFrame()
-        
-        if len(df.columns) == 0:
-            st.error("CSV file has no columns")
+        header = next(rows, None)
+        if header is None:
             return pd.DataFrame()
+        columns = []
+        seen = {}
+        for i, name in enumerate(header):
+            name = str(name) if name is not None else f"Unnamed: {i}"
+            # Mangle duplicate headers the same way pandas does ("A", "A.1", ...)
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            columns.append(name)
         
-        # Clean column names
-        df.columns = df.columns.str.strip()
-        
-        # Basic cleaning
-        df = clean_dataframe_for_arrow(df)
-        
-        st.success(f"Loaded CSV: {len(df)} rows × {len(df.columns)} columns")
-        return df
-        
+        chunks = []
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= CHUNK_SIZE:
+                chunks.append(pd.DataFrame(batch, columns=columns))
+                batch = []
+        if batch or not chunks:
+            chunks.append(pd.DataFrame(batch, columns=columns))
+    finally:
+        workbook.close()
+    
+    df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True, copy=False)
+    
+    # Trim trailing rows that openpyxl reports as entirely empty
+    last_row = df.last_valid_index()
+    if last_row is None:
+        return df.iloc[0:0]
+    return df.iloc[:last_row + 1]
+
+
+def _detect_encoding(file_bytes: bytes) -> str:
+    """Guess the encoding of CSV bytes from their first ENCODING_SAMPLE_BYTES."""
+    if detect_charset is None:
+        return 'utf-8'
+    
+    guess = detect_charset(file_bytes[:ENCODING_SAMPLE_BYTES]).best()
+    if guess is None or guess.encoding == 'ascii':
+        # An ASCII prefix says nothing about the rest of the file
+        return 'utf-8'
+    return guess.encoding
+
+
+def content_hash(file_bytes: bytes) -> str:
+    """Short digest of upload bytes, used as the cache key instead of the bytes themselves."""
+    return hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+
+
+def load_csv(file_bytes: bytes) -> pd.DataFrame:
+    """Load CSV data from uploaded bytes."""
+    try:
+        return _parse_csv(file_bytes)
     except Exception as e:
         st.error(f"Error loading CSV: {str(e)}")
         return pd.DataFrame()
 
 
+def _parse_csv(file_bytes: bytes) -> pd.DataFrame:
+    """Parse and clean CSV bytes; parse errors propagate to the caller."""
+    # Parse once with the sniffed encoding; latin-1 decodes any byte sequence
+    encoding = _detect_encoding(file_bytes)
+    try:
+        # Stream in chunks to bound the parser's working set
+        df = _read_csv_chunked(file_bytes, encoding)
+    except UnicodeDecodeError:
+        df = _read_csv_chunked(file_bytes, 'latin-1')
+    
+    # Basic validation
+    if df.empty:
+        st.warning("CSV file is empty")
+        return pd.DataFrame()
+    
+    if len(df.columns) == 0:
+        st.error("CSV file has no columns")
+        return pd.DataFrame()
+    
+    # Clean column names
+    df.columns = [col.strip() if isinstance(col, str) else col for col in df.columns]
+    
+    # Basic cleaning; text is kept as Arrow strings to shrink session memory
+    df = convert_to_arrow_strings(_categorize_low_cardinality(clean_dataframe_for_arrow(df, inplace=True)))
+    
+    st.success(f"Loaded CSV: {len(df)} rows × {len(df.columns)} columns")
+    return df
+
+
 def load_excel(file_bytes: bytes, sheet_name: Optional[str] = None) -> pd.DataFrame:
     """Load Excel data from uploaded bytes."""
     try:
-        file_io = BytesIO(file_bytes)
-        
-        # Load specific sheet or first sheet
-        if sheet_name:
-            df = pd.read_excel(file_io, sheet_name=sheet_name, engine='openpyxl')
-        else:
-            df = pd.read_excel(file_io, engine='openpyxl')
-        
-        # Basic validation
-        if df.empty:
-            st.warning("Excel file is empty")
-            return pd.DataFrame()
-        
-        if len(df.columns) == 0:
-            st.error("Excel file has no columns")
-            return pd.DataFrame()
-        
-        # Clean column names
-        df.columns = df.columns.str.strip()
-        
-        # Basic cleaning
-        df = clean_dataframe_for_arrow(df)
-        
-        st.success(f"Loaded Excel: {len(df)} rows × {len(df.columns)} columns")
-        return df
-        
+        return _parse_excel(file_bytes, sheet_name)
     except Exception as e:
         st.error(f"Error loading Excel: {str(e)}")
         return pd.DataFrame()
 
 
+def _parse_excel(file_bytes: bytes, sheet_name: Optional[str] = None) -> pd.DataFrame:
+    """Parse and clean Excel bytes; parse errors propagate to the caller."""
+    file_io = BytesIO(file_bytes)
+    
+    # Load specific sheet or first sheet
+    if EXCEL_ENGINE:
+        df = pd.read_excel(file_io, sheet_name=sheet_name or 0, engine=EXCEL_ENGINE)
+    else:
+        df = _read_excel_streaming(file_io, sheet_name)
+    
+    # Basic validation
+    if df.empty:
+        st.warning("Excel file is empty")
+        return pd.DataFrame()
+    
+    if len(df.columns) == 0:
+        st.error("Excel file has no columns")
+        return pd.DataFrame()
+    
+    # Clean column names
+    df.columns = [col.strip() if isinstance(col, str) else col for col in df.columns]
+    
+    # Basic cleaning; text is kept as Arrow strings to shrink session memory
+    df = convert_to_arrow_strings(_categorize_low_cardinality(clean_dataframe_for_arrow(df, inplace=True)))
+    
+    st.success(f"Loaded Excel: {len(df)} rows × {len(df.columns)} columns")
+    return df
+
+
 def detect_file_type(file_bytes: bytes, filename: str) -> str:
     """Detect file type from filename and content."""
+    # The content signature wins, so a renamed workbook never reaches the CSV parser
+    if file_bytes[:4] in EXCEL_SIGNATURES:
+        return 'excel'
+    
     filename_lower = filename.lower()
     
     if filename_lower.endswith('.csv'):
@@ -134,14 +308,38 @@ def load_file(file_bytes: bytes, filename: str, sheet_name: Optional[str] = None
         return pd.DataFrame()
 
 
+def load_and_clean(file_bytes: bytes, filename: str) -> pd.DataFrame:
+    """Load and Arrow-clean an uploaded file. Cached per file content so reruns skip parsing."""
+    try:
+        return _load_and_clean_cached(content_hash(file_bytes), filename, file_bytes)
+    except Exception as e:
+        # Failures raise out of the cached function, so a retry parses the file again
+        st.error(f"Error loading file: {str(e)}")
+        return pd.DataFrame()
+
+
+# The only parse cache: bounded, and keyed on the content hash since Streamlit
+# skips hashing parameters that start with an underscore
+@st.cache_data(show_spinner="Loading file...", max_entries=UPLOAD_CACHE_ENTRIES)
+def _load_and_clean_cached(file_hash: str, filename: str, _file_bytes: bytes) -> pd.DataFrame:
+    """Load upload bytes, already cleaned by the parsers; cached on file_hash and filename."""
+    file_type = detect_file_type(_file_bytes, filename)
+    
+    if file_type == 'csv':
+        return _parse_csv(_file_bytes)
+    elif file_type == 'excel':
+        return _parse_excel(_file_bytes)
+    else:
+        st.error(f"Unsupported file type: {filename}")
+        return pd.DataFrame()
+
+
 def save_dataframe_to_session(df: pd.DataFrame, name: str = "main_data") -> bool:
     """Save dataframe to session state."""
     try:
-        if f"df_{name}" not in st.session_state:
-            st.session_state[f"df_{name}"] = df.copy()
-            add_data_checkpoint(f"Saved dataframe: {name}", df)
-            return True
-        return False
+        st.session_state[f"df_{name}"] = df
+        add_data_checkpoint(f"Saved dataframe: {name}", df)
+        return True
     except Exception as e:
         st.error(f"Error saving dataframe to session: {str(e)}")
         return False
@@ -152,7 +350,7 @@ def load_dataframe_from_session(name: str = "main_data") -> Optional[pd.DataFram
     try:
         session_key = f"df_{name}"
         if session_key in st.session_state:
-            return st.session_state[session_key].copy()
+            return st.session_state[session_key]
         return None
     except Exception as e:
         st.error(f"Error loading dataframe from session: {str(e)}")
@@ -0,0 +1,123 @@
+"""
+LLM Cache
+=========
+Content-addressed on-disk cache for Tavily searches and Groq extractions.
+Entries are JSON files sharded by the first two hex digits of their key.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from typing import Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# Root directory for cached responses, under the project's temp_files regardless of the working directory
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(PROJECT_ROOT, "temp_files", "llm_cache")
+
+# Cached responses expire after a week
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Bump when the extraction prompt or result schema changes to invalidate old entries
+PROMPT_VERSION = "v1"
+
+
+def make_key(*parts: str) -> str:
+    """
+    Build a cache key from string parts.
+
+    Each part is length-prefixed before hashing so ("ab", "c") and
+    ("a", "bc") never collide.
+
+    Args:
+        parts: Strings identifying the request (provider, model, inputs...)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode('utf-8')
+        digest.update(len(encoded).to_bytes(8, 'big'))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    """Sharded file path of a cache entry."""
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.json")
+
+
+def get(key: str) -> Optional[Any]:
+    """
+    Load a cached response.
+
+    Args:
+        key: Key from make_key
+
+    Returns:
+        Cached response, or None when missing, expired or from another prompt version
+    """
+    path = _entry_path(key)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+        entry = None
+
+    if (
+        not isinstance(entry, dict)
+        or entry.get('prompt_version') != PROMPT_VERSION
+        or entry.get('expires_at', 0) < time.time()
+        or 'response' not in entry
+    ):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+    return entry['response']
+
+
+def put(key: str, value: Any, model: str = "", ttl: float = DEFAULT_TTL_SECONDS) -> None:
+    """
+    Store a response in the cache.
+
+    Args:
+        key: Key from make_key
+        value: JSON-serializable response
+        model: Provider or model that produced the response
+        ttl: Seconds until the entry expires
+    """
+    path = _entry_path(key)
+    now = time.time()
+    entry = {
+        'created_at': now,
+        'expires_at': now + ttl,
+        'model': model,
+        'prompt_version': PROMPT_VERSION,
+        'response': value
+    }
+
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a unique temp file and rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Could not cache response {key}: {e}")
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
@@ -4,18 +4,31 @@ Enhanced with Tavily + Groq Integration for Timber/Wood Business Research
 """
 
 import pandas as pd
+import numpy as np
 import time
 import streamlit as st
 from typing import Dict, List, Tuple, Optional, Callable
-import random
 import json
 from datetime import datetime
 import os
 import asyncio
 import requests
 import logging
+import re
+from collections import Counter
+from itertools import islice
+from string import Template
+from functools import lru_cache
 from dotenv import load_dotenv
 
+from services import llm_cache
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Load environment variables
 load_dotenv()
 
@@ -23,6 +36,110 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Research columns added by merge_with_original_data, with values for unresearched rows
+RESEARCH_DEFAULTS = {
+    'Research_Status': 'pending',
+    'Research_Email': '',
+    'Research_Phone': '',
+    'Research_Website': '',
+    'Research_Description': '',
+    'Research_Confidence': 0.0
+}
+
+# Compact dtypes for the research columns: few distinct statuses, short text, 0-1 scores
+try:
+    import pyarrow  # noqa: F401
+    _RESEARCH_TEXT_DTYPE = 'string[pyarrow]'
+except ImportError:
+    _RESEARCH_TEXT_DTYPE = 'string'
+
+RESEARCH_DTYPES = {
+    'Research_Status': 'category',
+    'Research_Email': _RESEARCH_TEXT_DTYPE,
+    'Research_Phone': _RESEARCH_TEXT_DTYPE,
+    'Research_Website': _RESEARCH_TEXT_DTYPE,
+    'Research_Description': _RESEARCH_TEXT_DTYPE,
+    'Research_Confidence': 'float32'
+}
+
+# Column names that hold the company in uploaded sheets, in order of preference
+COMPANY_COLUMN_CANDIDATES = ('Consignee Name', 'Company Name', 'Company', 'Consignee', 'Business Name')
+
+# Contact patterns tried on search results before asking Groq
+EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+PHONE_RE = re.compile(r"(?:\+?\d{1,3}[-\s]?)?(?:\(?\d{2,4}\)?[-\s]?)?\d{3,4}[-\s]?\d{3,4}")
+URL_RE = re.compile(r"https?://[^\s\"'<>]+")
+
+# Emails a domain needs before it is trusted without matching the company name
+MIN_MAJORITY_DOMAIN_EMAILS = 2
+
+# Markdown code fences around an LLM's JSON reply
+FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.MULTILINE)
+
+# Word characters of a company name
+NAME_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Company-name words too generic to identify an email domain
+COMPANY_STOPWORDS = frozenset({
+    'the', 'and', 'co', 'company', 'corp', 'corporation', 'inc', 'ltd', 'limited',
+    'pvt', 'private', 'llc', 'llp', 'plc', 'gmbh', 'group', 'international', 'india'
+})
+
+# Demo-mode contact formats, given the lower-cased company name
+DEMO_EMAIL_FORMATS = (
+    lambda name: f"info@{name.replace(' ', '').replace('corporation', 'corp').replace('limited', 'ltd')[:15]}.com",
+    lambda name: f"contact@{name.replace(' ', '')[:10]}.in",
+    lambda name: f"sales@{name.replace(' ', '').replace('&', 'and')[:12]}.co.in"
+)
+DEMO_PHONE_PREFIXES = ("+91-22-", "+91-11-", "+91-80-")
+DEMO_PHONE_HEAD_LOWS = np.array([2000, 4000, 2000])
+
+_demo_rng = np.random.default_rng()
+
+# Groq prompt for pulling a company's contact details out of search results
+EXTRACTION_PROMPT = Template("""
+            Extract contact information for the company "$company_name" from the following search results:
+            
+            $context
+            
+            Please extract and return ONLY valid contact information in JSON format:
+            {
+                "email": "valid_email@domain.com or null",
+                "phone": "valid_phone_number or null",
+                "website": "valid_website_url or null"
+            }
+            
+            Return only the JSON, no additional text.
+            """)
+
+# Tavily REST endpoint used by the async research path
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# Groq model used for contact extraction
+GROQ_MODEL = "llama-3.3-70b-versatile"
+
+# Tavily searches and Groq extractions in flight at once, and pooled HTTP connections
+RESEARCH_CONCURRENCY = 20
+EXTRACTION_CONCURRENCY = 10
+HTTP_CONNECTION_LIMIT = 30
+
+
+@lru_cache(maxsize=1024)
+def _company_domain_matcher(company_name: str) -> Optional[re.Pattern]:
+    """
+    Compile one pattern matching any distinctive word of a company name.
+    
+    A single alternation scans a domain once for all words instead of
+    testing each word separately. Longer words are tried first.
+    """
+    tokens = {
+        token for token in NAME_TOKEN_RE.findall(company_name.lower())
+        if len(token) >= 3 and token not in COMPANY_STOPWORDS
+    }
+    if not tokens:
+        return None
+    return re.compile("|".join(re.escape(token) for token in sorted(tokens, key=len, reverse=True)))
+
 
 class WebScraper:
     """Enhanced web scraper with Tavily and Groq integration."""
@@ -68,38 +185,23 @@ class WebScraper:
             return self.create_demo_result(company_name)
         
         try:
-            # Construct search query
-            search_query = f"{company_name} contact email phone"
-            if expected_city:
-                search_query += f" {expected_city}"
-            
-            # Search with Tavily
-            search_results = self.researcher.search(
-                search_query,
-                max_results=5,
-                search_depth="advanced"
-            )
+            # Search with Tavily unless this company was searched recently
+            cache_key = self._search_cache_key(company_name, expected_city)
+            search_results = llm_cache.get(cache_key)
+            if search_results is None:
+                search_results = self.researcher.search(
+                    self._build_search_query(company_name, expected_city),
+                    max_results=5,
+                    search_depth="advanced"
+                )
+                llm_cache.put(cache_key, search_results, model="tavily")
             
             # Extract contact information using Groq
+            contacts = []
             if search_results and 'results' in search_results:
                 contacts = self.extract_contacts_with_groq(search_results['results'], company_name)
-                
-                if contacts:
-                    return {
-                        'status': 'found',
-                        'contacts': contacts,
-                        'description': f"Contact information found for {company_name}",
-                        'confidence_score': 0.8,
-                        'search_results': len(search_results['results'])
-                    }
             
-            return {
-                'status': 'not_found',
-                'contacts': [],
-                'description': f"Limited information found for {company_name}",
-                'confidence_score': 0.2,
-                'search_results': 0
-            }
+            return self._build_research_result(company_name, search_results, contacts)
             
         except Exception as e:
             logger.error(f"Research error for {company_name}: {e}")
@@ -107,100 +209,332 @@ class WebScraper:
     
     def extract_contacts_with_groq(self, search_results: List[Dict], company_name: str) -> List[Dict]:
         """Extract contact information using Groq AI."""
+        local_contacts = self._extract_contacts_locally(search_results, company_name)
+        if local_contacts:
+            return local_contacts
+        
+        cache_key = self._extraction_cache_key(search_results, company_name)
+        cached = llm_cache.get(cache_key)
+        if isinstance(cached, list):
+            return cached
+        
         try:
             import groq
             client = groq.Groq(api_key=self.groq_key)
             
-            # Prepare context from search results
-            context = "\\n".join([
-                f"Title: {result.get('title', '')}\\nContent: {result.get('content', '')[:500]}"
-                for result in search_results[:3]
-            ])
-            
-            prompt = f"""
-            Extract contact information for the company "{company_name}" from the following search results:
-            
-            {context}
-            
-            Please extract and return ONLY valid contact information in JSON format:
-            {{
-                "email": "valid_email@domain.com or null",
-                "phone": "valid_phone_number or null",
-                "website": "valid_website_url or null"
-            }}
-            
-            Return only the JSON, no additional text.
-            """
-            
             response = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": prompt}],
+                model=GROQ_MODEL,
+                messages=[{"role": "user", "content": self._build_extraction_prompt(search_results, company_name)}],
                 temperature=0.1,
                 max_tokens=200
             )
             
-            # Parse response
-            result_text = response.choices[0].message.content.strip()
-            
-            # Clean and parse JSON
-            if result_text.startswith('```json'):
-                result_text = result_text.replace('```json', '').replace('```', '').strip()
+            contacts = self._parse_contacts(response.choices[0].message.content)
+            llm_cache.put(cache_key, contacts, model=GROQ_MODEL)
+            return contacts
             
-            contact_data = json.loads(result_text)
+        except Exception as e:
+            logger.error(f"Groq extraction error: {e}")
+            return []
+    
+    async def research_company_contacts_async(self, http_session, groq_client,
+                                              search_semaphore: asyncio.Semaphore,
+                                              extract_semaphore: asyncio.Semaphore,
+                                              company_name: str, expected_city: Optional[str] = None) -> Dict:
+        """
+        Research one company without blocking.
+        
+        Search and extraction hold separate semaphores, so the next company's
+        Tavily search can start while this one waits on Groq.
+        """
+        try:
+            cache_key = self._search_cache_key(company_name, expected_city)
+            search_results = llm_cache.get(cache_key)
+            if search_results is None:
+                async with search_semaphore:
+                    search_results = await self._tavily_search_async(
+                        http_session, self._build_search_query(company_name, expected_city)
+                    )
+                llm_cache.put(cache_key, search_results, model="tavily")
             
-            # Validate and format
             contacts = []
-            if contact_data.get('email') and '@' in str(contact_data['email']):
-                contacts.append({
-                    'email': contact_data['email'],
-                    'phone': contact_data.get('phone'),
-                    'website': contact_data.get('website')
-                })
+            if search_results and 'results' in search_results:
+                contacts = await self.extract_contacts_with_groq_async(
+                    groq_client, search_results['results'], company_name, extract_semaphore
+                )
             
+            return self._build_research_result(company_name, search_results, contacts)
+            
+        except Exception as e:
+            logger.error(f"Research error for {company_name}: {e}")
+            return self.create_fallback_result(company_name, str(e))
+    
+    async def extract_contacts_with_groq_async(self, groq_client, search_results: List[Dict],
+                                               company_name: str,
+                                               semaphore: asyncio.Semaphore) -> List[Dict]:
+        """Extract contact information using Groq's async client."""
+        local_contacts = self._extract_contacts_locally(search_results, company_name)
+        if local_contacts:
+            return local_contacts
+        
+        cache_key = self._extraction_cache_key(search_results, company_name)
+        cached = llm_cache.get(cache_key)
+        if isinstance(cached, list):
+            return cached
+        
+        if groq_client is None:
+            return []
+        
+        try:
+            async with semaphore:
+                response = await groq_client.chat.completions.create(
+                    model=GROQ_MODEL,
+                    messages=[{"role": "user", "content": self._build_extraction_prompt(search_results, company_name)}],
+                    temperature=0.1,
+                    max_tokens=200
+                )
+            
+            contacts = self._parse_contacts(response.choices[0].message.content)
+            llm_cache.put(cache_key, contacts, model=GROQ_MODEL)
             return contacts
             
         except Exception as e:
             logger.error(f"Groq extraction error: {e}")
             return []
     
-    def create_demo_result(self, company_name: str) -> Dict:
-        """Create demo result for companies."""
-        # Generate realistic demo data
-        demo_emails = [
-            f"info@{company_name.lower().replace(' ', '').replace('corporation', 'corp').replace('limited', 'ltd')[:15]}.com",
-            f"contact@{company_name.lower().replace(' ', '')[:10]}.in",
-            f"sales@{company_name.lower().replace(' ', '').replace('&', 'and')[:12]}.co.in"
-        ]
+    async def research_many(self, targets: List[Tuple[str, Optional[str]]],
+                            on_result: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, Dict]:
+        """
+        Research many companies concurrently.
+        
+        Args:
+            targets: (company_name, expected_city) pairs
+            on_result: Called with (company_name, result) as each company finishes
+            
+        Returns:
+            Research results keyed by company name
+        """
+        results = {}
+        
+        if not self.researcher:
+            results = self.create_demo_results_batch([company_name for company_name, _ in targets])
+            if on_result:
+                for company_name, result in results.items():
+                    on_result(company_name, result)
+            return results
         
-        demo_phones = [
-            "+91-22-" + str(random.randint(2000, 9999)) + "-" + str(random.randint(1000, 9999)),
-            "+91-11-" + str(random.randint(4000, 9999)) + "-" + str(random.randint(1000, 9999)),
-            "+91-80-" + str(random.randint(2000, 9999)) + "-" + str(random.randint(1000, 9999))
+        import aiohttp
+        try:
+            import groq
+            groq_client = groq.AsyncGroq(api_key=self.groq_key)
+        except ImportError:
+            logger.warning("Groq not available - contacts will not be extracted")
+            groq_client = None
+        
+        search_semaphore = asyncio.Semaphore(RESEARCH_CONCURRENCY)
+        extract_semaphore = asyncio.Semaphore(EXTRACTION_CONCURRENCY)
+        connector = aiohttp.TCPConnector(limit=HTTP_CONNECTION_LIMIT)
+        
+        async with aiohttp.ClientSession(connector=connector) as http_session:
+            async def research_one(company_name, expected_city):
+                result = await self.research_company_contacts_async(
+                    http_session, groq_client, search_semaphore, extract_semaphore,
+                    company_name, expected_city
+                )
+                return company_name, result
+            
+            pending = [research_one(company_name, city) for company_name, city in targets]
+            for finished in asyncio.as_completed(pending):
+                company_name, result = await finished
+                results[company_name] = result
+                if on_result:
+                    on_result(company_name, result)
+        
+        return results
+    
+    def research_many_sync(self, targets: List[Tuple[str, Optional[str]]],
+                           on_result: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, Dict]:
+        """Blocking wrapper around research_many for Streamlit callers."""
+        return asyncio.run(self.research_many(targets, on_result))
+    
+    async def _tavily_search_async(self, http_session, query: str) -> Dict:
+        """Run a Tavily search over the shared aiohttp session."""
+        payload = {
+            'api_key': self.tavily_key,
+            'query': query,
+            'max_results': 5,
+            'search_depth': 'advanced'
+        }
+        async with http_session.post(TAVILY_SEARCH_URL, json=payload) as response:
+            response.raise_for_status()
+            return await response.json()
+    
+    @staticmethod
+    def _extract_contacts_locally(search_results: List[Dict], company_name: str) -> List[Dict]:
+        """
+        Pick a contact straight out of the search results when it is unambiguous.
+        
+        An email qualifies when its domain contains a distinctive word of the
+        company name, or when one domain accounts for most emails found and
+        appears at least MIN_MAJORITY_DOMAIN_EMAILS times.
+        
+        Returns:
+            A single-contact list, or an empty list when Groq should decide
+        """
+        found = [
+            (result, candidate)
+            for result in search_results
+            for candidate in EMAIL_RE.findall(str(result.get('content', '')))
         ]
+        if not found:
+            return []
         
-        # Random success rate for demo
-        success_rate = random.random()
+        domains = [candidate.split('@', 1)[1].lower() for _, candidate in found]
+        matcher = _company_domain_matcher(company_name)
+        match = None
+        if matcher is not None:
+            match = next(
+                (entry for entry, domain in zip(found, domains) if matcher.search(domain)),
+                None
+            )
         
-        if success_rate > 0.3:  # 70% success rate for demo
+        if match is None:
+            domain, count = Counter(domains).most_common(1)[0]
+            if count < MIN_MAJORITY_DOMAIN_EMAILS or count * 2 <= len(found):
+                return []
+            match = found[domains.index(domain)]
+        
+        # Phone and website come from the result that supplied the email so
+        # numbers from unrelated directory listings are not attached to it
+        source, email = match
+        domain = email.split('@', 1)[1].lower()
+        source_content = str(source.get('content', ''))
+        urls = [str(source.get('url', ''))] + URL_RE.findall(source_content)
+        urls += [str(result.get('url', '')) for result in search_results]
+        phone = PHONE_RE.search(source_content)
+        
+        return [{
+            'email': email,
+            'phone': phone.group(0).strip() if phone else None,
+            'website': next((url for url in urls if domain in url.lower()), None)
+        }]
+    
+    @staticmethod
+    def _search_cache_key(company_name: str, expected_city: Optional[str] = None) -> str:
+        """Cache key of a Tavily search for a company."""
+        return llm_cache.make_key("tavily", llm_cache.PROMPT_VERSION, company_name, expected_city or "")
+    
+    @staticmethod
+    def _extraction_cache_key(search_results: List[Dict], company_name: str) -> str:
+        """Cache key of a Groq extraction over the same context the prompt uses."""
+        context_parts = []
+        for result in search_results[:3]:
+            context_parts.append(str(result.get('title', '')))
+            context_parts.append(str(result.get('content', ''))[:500])
+        context_hash = llm_cache.make_key(*context_parts)
+        return llm_cache.make_key("groq", GROQ_MODEL, llm_cache.PROMPT_VERSION, company_name, context_hash)
+    
+    @staticmethod
+    def _build_search_query(company_name: str, expected_city: Optional[str] = None) -> str:
+        """Construct the Tavily search query for a company."""
+        search_query = f"{company_name} contact email phone"
+        if expected_city:
+            search_query += f" {expected_city}"
+        return search_query
+    
+    @staticmethod
+    def _build_extraction_prompt(search_results: List[Dict], company_name: str) -> str:
+        """Build the Groq extraction prompt from the top search results."""
+        # Prepare context from search results
+        context = "\\n".join(
+            f"Title: {result.get('title', '')}\\nContent: {result.get('content', '')[:500]}"
+            for result in islice(search_results, 3)
+        )
+        
+        return EXTRACTION_PROMPT.substitute(company_name=company_name, context=context)
+    
+    @staticmethod
+    def _parse_contacts(result_text: str) -> List[Dict]:
+        """Parse Groq's JSON reply into a list of validated contacts."""
+        # Clean and parse JSON
+        contact_data = _json_loads(FENCE_RE.sub('', result_text.strip()).strip())
+        if not isinstance(contact_data, dict):
+            return []
+        
+        # Validate and format
+        contacts = []
+        if contact_data.get('email') and '@' in str(contact_data['email']):
+            contacts.append({
+                'email': contact_data['email'],
+                'phone': contact_data.get('phone'),
+                'website': contact_data.get('website')
+            })
+        
+        return contacts
+    
+    @staticmethod
+    def _build_research_result(company_name: str, search_results: Optional[Dict], contacts: List[Dict]) -> Dict:
+        """Assemble the result dict for a finished search."""
+        if contacts:
             return {
                 'status': 'found',
-                'contacts': [{
-                    'email': random.choice(demo_emails),
-                    'phone': random.choice(demo_phones),
-                    'website': f"www.{company_name.lower().replace(' ', '')[:10]}.com"
-                }],
-                'description': f"Demo: {company_name} - Timber and wood processing company",
-                'confidence_score': random.uniform(0.7, 0.9),
-                'search_results': random.randint(3, 8)
-            }
-        else:
-            return {
-                'status': 'not_found',
-                'contacts': [],
-                'description': f"Demo: Limited information available for {company_name}",
-                'confidence_score': random.uniform(0.1, 0.3),
-                'search_results': random.randint(0, 2)
+                'contacts': contacts,
+                'description': f"Contact information found for {company_name}",
+                'confidence_score': 0.8,
+                'search_results': len(search_results['results'])
             }
+        
+        return {
+            'status': 'not_found',
+            'contacts': [],
+            'description': f"Limited information found for {company_name}",
+            'confidence_score': 0.2,
+            'search_results': 0
+        }
+    
+    def create_demo_result(self, company_name: str) -> Dict:
+        """Create demo result for companies."""
+        return self.create_demo_results_batch([company_name])[company_name]
+    
+    def create_demo_results_batch(self, company_names: List[str]) -> Dict[str, Dict]:
+        """Create demo results for many companies with one set of vectorized draws."""
+        count = len(company_names)
+        
+        # Draw every random value for the batch up front
+        email_choice = _demo_rng.integers(0, len(DEMO_EMAIL_FORMATS), size=count)
+        phone_choice = _demo_rng.integers(0, len(DEMO_PHONE_PREFIXES), size=count)
+        phone_heads = _demo_rng.integers(DEMO_PHONE_HEAD_LOWS[phone_choice], 10000)
+        phone_tails = _demo_rng.integers(1000, 10000, size=count)
+        found = _demo_rng.random(count) > 0.3  # 70% success rate for demo
+        found_confidence = _demo_rng.uniform(0.7, 0.9, size=count)
+        missing_confidence = _demo_rng.uniform(0.1, 0.3, size=count)
+        found_hits = _demo_rng.integers(3, 9, size=count)
+        missing_hits = _demo_rng.integers(0, 3, size=count)
+        
+        results = {}
+        for i, company_name in enumerate(company_names):
+            if found[i]:
+                results[company_name] = {
+                    'status': 'found',
+                    'contacts': [{
+                        'email': DEMO_EMAIL_FORMATS[email_choice[i]](company_name.lower()),
+                        'phone': f"{DEMO_PHONE_PREFIXES[phone_choice[i]]}{phone_heads[i]}-{phone_tails[i]}",
+                        'website': f"www.{company_name.lower().replace(' ', '')[:10]}.com"
+                    }],
+                    'description': f"Demo: {company_name} - Timber and wood processing company",
+                    'confidence_score': float(found_confidence[i]),
+                    'search_results': int(found_hits[i])
+                }
+            else:
+                results[company_name] = {
+                    'status': 'not_found',
+                    'contacts': [],
+                    'description': f"Demo: Limited information available for {company_name}",
+                    'confidence_score': float(missing_confidence[i]),
+                    'search_results': int(missing_hits[i])
+                }
+        
+        return results
     
     def create_fallback_result(self, company_name: str, error_msg: str) -> Dict:
         """Create fallback result for errors."""
@@ -213,76 +547,133 @@ class WebScraper:
         }
 
 
+@lru_cache(maxsize=64)
+def _find_company_column(columns: tuple) -> Optional[str]:
+    """First company column candidate present in a set of column labels."""
+    for col in COMPANY_COLUMN_CANDIDATES:
+        if col in columns:
+            return col
+    return None
+
+
 class ResearchResultsManager:
     """Manage research results and data merging."""
     
+    @staticmethod
+    def _resolve_company_column(df: pd.DataFrame) -> Optional[str]:
+        """Find the company column; frames returned by a merge record it in attrs."""
+        cached = df.attrs.get('company_column')
+        if cached in df.columns:
+            return cached
+        return _find_company_column(tuple(df.columns))
+    
+    @staticmethod
+    def normalize_company_names(names: pd.Series) -> pd.Series:
+        """Normalize company names for matching: trimmed and upper-cased."""
+        return names.astype(str).str.strip().str.upper()
+    
+    @staticmethod
+    def unique_targets(df: pd.DataFrame, company_column: str) -> Dict[str, str]:
+        """
+        Distinct companies to research, ignoring case and surrounding spaces.
+        
+        Args:
+            df: Data containing the company column
+            company_column: Column holding company names
+            
+        Returns:
+            Mapping of normalized name to its first original spelling
+        """
+        companies = df[company_column].dropna()
+        normalized = ResearchResultsManager.normalize_company_names(companies)
+        first_seen = ~normalized.duplicated()
+        return dict(zip(normalized[first_seen], companies[first_seen]))
+    
     @staticmethod
     def format_results_for_display(research_results: Dict) -> pd.DataFrame:
         """Format research results for display."""
-        results_data = []
+        # Fill one list per column instead of building a dict per row
+        statuses, emails, phones, websites, descriptions = [], [], [], [], []
         
-        for company, result in research_results.items():
+        for result in research_results.values():
             if result['status'] == 'found':
                 contacts = result.get('contacts', [])
-                primary_email = contacts[0]['email'] if contacts else 'No email'
-                phone = contacts[0].get('phone', 'No phone') if contacts else 'No phone'
-                website = result.get('website', contacts[0].get('website', 'No website')) if contacts else 'No website'
-                description = result.get('description', 'No description')
-                confidence = f"{result.get('confidence_score', 0):.0%}"
+                emails.append(contacts[0]['email'] if contacts else 'No email')
+                phones.append(contacts[0].get('phone', 'No phone') if contacts else 'No phone')
+                websites.append(result.get('website', contacts[0].get('website', 'No website')) if contacts else 'No website')
+                descriptions.append(result.get('description', 'No description'))
             else:
-                primary_email = phone = website = 'Not found'
-                description = result.get('description', 'Research failed')
-                confidence = f"{result.get('confidence_score', 0):.0%}"
-            
-            results_data.append({
-                'Company': company,
-                'Status': result['status'].title(),
-                'Email': primary_email,
-                'Phone': phone,
-                'Website': website,
-                'Description': description,
-                'Confidence': confidence
-            })
+                emails.append('Not found')
+                phones.append('Not found')
+                websites.append('Not found')
+                descriptions.append(result.get('description', 'Research failed'))
+            statuses.append(result['status'].title())
+        
+        confidence = np.fromiter(
+            (result.get('confidence_score', 0) for result in research_results.values()),
+            dtype=np.float64,
+            count=len(research_results)
+        )
+        confidence_pct = (confidence * 100).round().astype(int)
         
-        return pd.DataFrame(results_data)
+        return pd.DataFrame({
+            'Company': list(research_results.keys()),
+            'Status': statuses,
+            'Email': emails,
+            'Phone': phones,
+            'Website': websites,
+            'Description': descriptions,
+            'Confidence': [f"{pct}%" for pct in confidence_pct]
+        })
     
     @staticmethod
     def merge_with_original_data(original_data: pd.DataFrame, research_results: Dict) -> pd.DataFrame:
         """Merge research results with original data."""
-        enhanced_data = original_data.copy()
-        
         # Find company column
-        company_column = None
-        for col in ['Consignee Name', 'Company Name', 'Company', 'Consignee', 'Business Name']:
-            if col in enhanced_data.columns:
-                company_column = col
-                break
+        company_column = ResearchResultsManager._resolve_company_column(original_data)
         
         if not company_column:
-            return enhanced_data
+            return original_data.copy()
         
-        # Add research result columns
-        enhanced_data['Research_Status'] = 'pending'
-        enhanced_data['Research_Email'] = ''
-        enhanced_data['Research_Phone'] = ''
-        enhanced_data['Research_Website'] = ''
-        enhanced_data['Research_Description'] = ''
-        enhanced_data['Research_Confidence'] = 0.0
+        # The concat below copies, so the result never shares arrays with the caller's frame;
+        # later writes (e.g. email status sync) must not reach the session's original data
+        enhanced_data = original_data
         
-        # Merge results
+        # One row per researched company, joined onto every matching record at once
+        research_rows = []
         for company, result in research_results.items():
-            mask = enhanced_data[company_column] == company
-            
-            enhanced_data.loc[mask, 'Research_Status'] = result['status']
-            
-            if result['status'] == 'found' and result.get('contacts'):
-                contact = result['contacts'][0]
-                enhanced_data.loc[mask, 'Research_Email'] = contact.get('email', '')
-                enhanced_data.loc[mask, 'Research_Phone'] = contact.get('phone', '')
-                enhanced_data.loc[mask, 'Research_Website'] = contact.get('website', '')
-            
-            enhanced_data.loc[mask, 'Research_Description'] = result.get('description', '')
-            enhanced_data.loc[mask, 'Research_Confidence'] = result.get('confidence_score', 0.0)
+            contact = result['contacts'][0] if result['status'] == 'found' and result.get('contacts') else {}
+            research_rows.append({
+                'company': company,
+                'Research_Status': result['status'],
+                'Research_Email': contact.get('email', ''),
+                'Research_Phone': contact.get('phone', ''),
+                'Research_Website': contact.get('website', ''),
+                'Research_Description': result.get('description', ''),
+                'Research_Confidence': result.get('confidence_score', 0.0)
+            })
+        
+        # Object columns keep phone numbers and the like from being read as numbers
+        research_df = pd.DataFrame(research_rows, columns=['company'] + list(RESEARCH_DEFAULTS), dtype=object)
+        research_df = research_df.astype({'Research_Confidence': 'float64'})
+        
+        # Match on normalized names so spelling variants of a company share its result
+        research_df.index = ResearchResultsManager.normalize_company_names(research_df.pop('company'))
+        research_df = research_df[~research_df.index.duplicated()]
+        matched = research_df.reindex(
+            ResearchResultsManager.normalize_company_names(enhanced_data[company_column])
+        )
+        matched.index = enhanced_data.index
+        
+        # Records of companies not researched yet
+        matched = matched.fillna(RESEARCH_DEFAULTS).astype(RESEARCH_DTYPES)
+        
+        # Replace research columns from an earlier merge
+        stale_columns = enhanced_data.columns.intersection(list(RESEARCH_DEFAULTS))
+        if len(stale_columns):
+            enhanced_data = enhanced_data.drop(columns=stale_columns)
+        enhanced_data = pd.concat([enhanced_data, matched], axis=1)
+        enhanced_data.attrs['company_column'] = company_column
         
         return enhanced_data
 
@@ -12,7 +12,53 @@ import pandas as pd
 import uuid
 import json
 from datetime import datetime
+from collections import deque
+from functools import lru_cache
 import os
+import shutil
+from pathlib import Path
+import time
+import atexit
+import tempfile
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from services.session_manager import session_manager
+except ImportError:
+    session_manager = None
+
+# Checkpoints kept in data_history; older ones are dropped automatically
+DATA_HISTORY_LIMIT = 10
+
+# Minimum seconds between metadata writes per session; skipped writes are flushed
+# by the next save past the interval, or at exit
+METADATA_SAVE_INTERVAL = 1.0
+
+# AppState fields holding dataframes; assigning any of them bumps the data version
+DATAFRAME_FIELDS = frozenset({
+    'original_dataframe', 'main_dataframe', 'filtered_dataframe', 'working_data'
+})
+
+# Workflow stages in order, and the stages each one requires to be completed first
+_STAGE_ORDER = ('upload', 'map', 'analyze')
+_STAGE_PREREQS = {stage: _STAGE_ORDER[:i] for i, stage in enumerate(_STAGE_ORDER)}
+
+# Active stage indexed by (upload << 2) | (map << 1) | analyze completion bits
+_ACTIVE_STAGE_TABLE = (
+    'upload', 'upload', 'upload', 'upload',
+    'map', 'map',
+    'analyze', 'analyze'
+)
+
+# Session threads share these; _metadata_lock guards both dicts and the file writes
+_last_metadata_save: Dict[str, float] = {}
+_pending_metadata: Dict[str, bytes] = {}
+_metadata_lock = threading.Lock()
 
 @dataclass
 class AppState:
@@ -42,7 +88,7 @@ class AppState:
     working_data: Optional[pd.DataFrame] = None  # Current working dataset
     
     # Data History for Undo/Resume functionality
-    data_history: List[Dict[str, Any]] = field(default_factory=list)
+    data_history: deque = field(default_factory=lambda: deque(maxlen=DATA_HISTORY_LIMIT))
     
     # Filter state (Enhanced)
     filters_applied: Dict[str, Any] = field(default_factory=dict)
@@ -96,7 +142,7 @@ def initialize_session_state() -> None:
         }
     
     if 'data_history' not in st.session_state:
-        st.session_state.data_history = []
+        st.session_state.data_history = deque(maxlen=DATA_HISTORY_LIMIT)
     
     if 'current_session_active' not in st.session_state:
         st.session_state.current_session_active = False
@@ -122,11 +168,20 @@ def update_state(**kwargs) -> None:
             setattr(state, key, value)
         else:
             raise ValueError(f"Invalid state attribute: {key}")
+    
+    if not DATAFRAME_FIELDS.isdisjoint(kwargs):
+        bump_data_version()
 
 
 def reset_state() -> None:
     """Reset state to initial values."""
     st.session_state.app_state = AppState()
+    bump_data_version()
+
+
+def bump_data_version() -> None:
+    """Mark the session's dataframes as changed so per-data caches are invalidated."""
+    st.session_state._data_version = st.session_state.get('_data_version', 0) + 1
 
 
 def get_state_summary() -> Dict[str, Any]:
@@ -182,17 +237,15 @@ def create_session_directories(session_id: str) -> None:
         pass
 
 
+@lru_cache(maxsize=32)
 def get_session_directory(session_id: str) -> str:
     """Get the directory path for a session."""
     return os.path.join("temp_files", f"session_{session_id}")
 
 
-def save_session_metadata(state: AppState) -> bool:
-    """Save session metadata to JSON file."""
+def save_session_metadata(state: AppState, force: bool = False) -> bool:
+    """Save session metadata to JSON file, at most once per METADATA_SAVE_INTERVAL unless forced."""
     try:
-        session_dir = get_session_directory(state.session_id)
-        metadata_path = os.path.join(session_dir, "session_metadata.json")
-        
         # Update last_updated timestamp
         state.last_updated = datetime.now().isoformat()
         
@@ -208,18 +261,78 @@ def save_session_metadata(state: AppState) -> bool:
             "email_campaign_config": state.email_campaign_config
         }
         
-        # Ensure directory exists
-        os.makedirs(session_dir, exist_ok=True)
+        if orjson is not None:
+            data = orjson.dumps(
+                metadata,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+        else:
+            data = json.dumps(metadata, indent=2).encode('utf-8')
         
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        with _metadata_lock:
+            now = time.monotonic()
+            _flush_due_metadata(now)
+            
+            last_save = _last_metadata_save.get(state.session_id)
+            if not force and last_save is not None and now - last_save < METADATA_SAVE_INTERVAL:
+                # Keep only the encoded bytes; they are written once the interval has passed
+                _pending_metadata[state.session_id] = data
+                return True
             
+            _pending_metadata.pop(state.session_id, None)
+            _write_session_metadata(state.session_id, data, now)
         return True
     except Exception as e:
         # Silently handle metadata save errors to avoid breaking the app
         return False
 
 
+def _write_session_metadata(session_id: str, data: bytes, now: float) -> None:
+    """Write encoded metadata for a session and record when it was saved; caller holds _metadata_lock."""
+    _last_metadata_save[session_id] = now
+    
+    # Ensure directory exists
+    create_session_directories(session_id)
+    metadata_path = os.path.join(get_session_directory(session_id), "session_metadata.json")
+    
+    # Write beside the target and swap it in, so readers never see a partial file
+    tmp = tempfile.NamedTemporaryFile(dir=os.path.dirname(metadata_path), suffix=".tmp", delete=False)
+    tmp_path = Path(tmp.name)
+    try:
+        with tmp:
+            tmp.write(data)
+        tmp_path.replace(metadata_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _flush_due_metadata(now: float) -> None:
+    """Write debounced metadata whose save interval has elapsed; caller holds _metadata_lock."""
+    for session_id, data in list(_pending_metadata.items()):
+        if now - _last_metadata_save.get(session_id, 0.0) >= METADATA_SAVE_INTERVAL:
+            _pending_metadata.pop(session_id, None)
+            try:
+                _write_session_metadata(session_id, data, now)
+            except OSError:
+                continue
+
+
+def _flush_pending_metadata() -> None:
+    """Write metadata whose saves were skipped by the debounce."""
+    with _metadata_lock:
+        now = time.monotonic()
+        for session_id, data in list(_pending_metadata.items()):
+            _pending_metadata.pop(session_id, None)
+            try:
+                _write_session_metadata(session_id, data, now)
+            except OSError:
+                continue
+
+
+atexit.register(_flush_pending_metadata)
+
+
 def load_session_metadata(session_id: str) -> Optional[Dict[str, Any]]:
     """Load session metadata from JSON file."""
     try:
@@ -263,12 +376,9 @@ def add_data_checkpoint(description: str, data: Optional[pd.DataFrame] = None) -
             "data_shape": data.shape if data is not None else None
         }
         
+        # The deque keeps only the last DATA_HISTORY_LIMIT checkpoints
         state.data_history.append(checkpoint)
         
-        # Keep only last 10 checkpoints to avoid memory issues
-        if len(state.data_history) > 10:
-            state.data_history = state.data_history[-10:]
-        
         # Also update Streamlit session state
         if 'data_history' in st.session_state:
             st.session_state.data_history = state.data_history
@@ -282,19 +392,12 @@ def can_proceed_to_stage(target_stage: str) -> bool:
     try:
         state = get_state()
         
-        stage_order = ['upload', 'map', 'analyze']
-        
-        if target_stage not in stage_order:
+        prereqs = _STAGE_PREREQS.get(target_stage)
+        if prereqs is None:
             return False
         
-        target_index = stage_order.index(target_stage)
-        
         # Check if all previous stages are completed
-        for i in range(target_index):
-            if not state.stage_progress[stage_order[i]]:
-                return False
-        
-        return True
+        return all(state.stage_progress[stage] for stage in prereqs)
     except Exception as e:
         return True  # Allow progression if there's an error
 
@@ -326,14 +429,14 @@ def cleanup_old_sessions(days_old: int = 7) -> int:
         cutoff_time = datetime.now().timestamp() - (days_old * 24 * 60 * 60)
         cleaned_count = 0
         
-        for item in os.listdir(base_dir):
-            item_path = os.path.join(base_dir, item)
-            if os.path.isdir(item_path) and item.startswith("session_"):
-                # Check if directory is old enough
-                if os.path.getctime(item_path) < cutoff_time:
-                    import shutil
-                    shutil.rmtree(item_path)
-                    cleaned_count += 1
+        # DirEntry carries type and stat results from the directory scan itself
+        with os.scandir(base_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith("session_") and entry.is_dir():
+                    # Check if directory is old enough
+                    if entry.stat().st_ctime < cutoff_time:
+                        shutil.rmtree(entry.path)
+                        cleaned_count += 1
         
         return cleaned_count
     except Exception as e:
@@ -355,23 +458,17 @@ def manage_stage_transitions(target_stage: str) -> bool:
         bool: Whether transition is allowed
     """
     try:
-        current_progress = st.session_state.get('stage_progress', {})
-        
-        # Define stage order and prerequisites
-        stage_order = ['upload', 'map', 'analyze']
-        
-        if target_stage not in stage_order:
+        prereqs = _STAGE_PREREQS.get(target_stage)
+        if prereqs is None:
             st.error(f"Invalid stage: {target_stage}")
             return False
         
-        target_index = stage_order.index(target_stage)
-        
         # Check if all previous stages are completed
-        for i in range(target_index):
-            prev_stage = stage_order[i]
-            if not current_progress.get(prev_stage, False):
-                st.warning(f"Please complete {prev_stage} stage first")
-                return False
+        current_progress = st.session_state.get('stage_progress') or {}
+        missing = next((stage for stage in prereqs if not current_progress.get(stage, False)), None)
+        if missing:
+            st.warning(f"Please complete {missing} stage first")
+            return False
         
         return True
         
@@ -391,29 +488,40 @@ def validate_stage_completion(stage: str) -> bool:
         bool: Whether stage is complete
     """
     try:
-        if stage == "upload":
-            # Check if data is uploaded and filtered
-            return (st.session_state.get('working_data') is not None and
-                    len(st.session_state.get('data_history', [])) > 0)
-        
-        elif stage == "map":
-            # Check if research is completed
-            return (st.session_state.get('working_data') is not None and
-                    'research_results' in st.session_state and
-                    st.session_state.get('research_results'))
-        
-        elif stage == "analyze":
-            # Check if email campaign is configured
-            return (st.session_state.get('working_data') is not None and
-                    'email_results' in st.session_state)
-        
-        return False
+        # Read each requirement from session state once, then look up the cached rule
+        state = st.session_state
+        return _stage_requirements_met(
+            stage,
+            state.get('working_data') is not None,
+            len(state.get('data_history', [])) > 0,
+            bool(state.get('research_results')),
+            'email_results' in state
+        )
         
     except Exception as e:
         st.warning(f"Error validating stage completion: {str(e)}")
         return False
 
 
+@lru_cache(maxsize=64)
+def _stage_requirements_met(stage: str, has_data: bool, has_history: bool,
+                            has_research: bool, has_email: bool) -> bool:
+    """Stage completion rules, independent of Streamlit so results can be memoized."""
+    if stage == "upload":
+        # Check if data is uploaded and filtered
+        return has_data and has_history
+    
+    elif stage == "map":
+        # Check if research is completed
+        return has_data and has_research
+    
+    elif stage == "analyze":
+        # Check if email campaign is configured
+        return has_data and has_email
+    
+    return False
+
+
 def handle_session_restoration() -> bool:
     """
     Allow users to resume from any stage by restoring session data.
@@ -422,7 +530,8 @@ def handle_session_restoration() -> bool:
         bool: Whether session was successfully restored
     """
     try:
-        from services.session_manager import session_manager
+        if session_manager is None:
+            return False
         
         if 'session_id' in st.session_state and st.session_state.session_id:
             session_id = st.session_state.session_id
@@ -464,7 +573,8 @@ def save_current_session_state() -> bool:
         bool: Whether save was successful
     """
     try:
-        from services.session_manager import session_manager
+        if session_manager is None:
+            return False
         
         if 'session_id' in st.session_state and st.session_state.session_id:
             return session_manager.save_session_state(st.session_state.session_id)
@@ -484,7 +594,9 @@ def create_new_workflow_session() -> str:
         str: New session ID
     """
     try:
-        from services.session_manager import session_manager
+        if session_manager is None:
+            st.error("Error creating new session: session manager is not available")
+            return ""
         
         # Create new session
         new_session_id = session_manager.create_new_session()
@@ -504,7 +616,8 @@ def create_new_workflow_session() -> str:
             
             # Clear data
             st.session_state.working_data = None
-            st.session_state.data_history = []
+            st.session_state.data_history = deque(maxlen=DATA_HISTORY_LIMIT)
+            bump_data_version()
             
             return new_session_id
         
@@ -523,14 +636,18 @@ def get_workflow_status() -> Dict[str, Any]:
         Dict with workflow status details
     """
     try:
+        # One read of session state instead of a proxy lookup per field
+        snapshot = st.session_state.to_dict()
+        progress = snapshot.get('stage_progress') or {}
+        
         return {
-            "session_id": st.session_state.get('session_id', ''),
-            "session_active": st.session_state.get('current_session_active', False),
-            "workflow_state": st.session_state.get('workflow_state', 'unknown'),
-            "stage_progress": st.session_state.get('stage_progress', {}),
-            "has_working_data": st.session_state.get('working_data') is not None,
-            "data_history_count": len(st.session_state.get('data_history', [])),
-            "current_stage": get_current_active_stage(),
+            "session_id": snapshot.get('session_id', ''),
+            "session_active": snapshot.get('current_session_active', False),
+            "workflow_state": snapshot.get('workflow_state', 'unknown'),
+            "stage_progress": progress,
+            "has_working_data": snapshot.get('working_data') is not None,
+            "data_history_count": len(snapshot.get('data_history', [])),
+            "current_stage": _active_stage(progress),
             "next_available_stage": get_next_available_stage()
         }
         
@@ -539,6 +656,16 @@ def get_workflow_status() -> Dict[str, Any]:
         return {"error": str(e)}
 
 
+def _active_stage(progress: Dict[str, bool]) -> str:
+    """First incomplete stage in a stage_progress dict, or 'analyze' when all are done."""
+    index = (
+        (bool(progress.get('upload')) << 2)
+        | (bool(progress.get('map')) << 1)
+        | bool(progress.get('analyze'))
+    )
+    return _ACTIVE_STAGE_TABLE[index]
+
+
 def get_current_active_stage() -> str:
     """
     Determine the current active stage based on progress.
@@ -546,17 +673,4 @@ def get_current_active_stage() -> str:
     Returns:
         str: Current active stage
     """
-    try:
-        progress = st.session_state.get('stage_progress', {})
-        
-        if not progress.get('upload', False):
-            return 'upload'
-        elif not progress.get('map', False):
-            return 'map'
-        elif not progress.get('analyze', False):
-            return 'analyze'
-        else:
-            return 'analyze'  # All stages complete
-        
-    except Exception as e:
-        return 'upload'  # Default fallback
+    return _active_stage(st.session_state.get('stage_progress') or {})
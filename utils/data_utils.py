@@ -4,18 +4,67 @@ Data Utilities
 Helper functions for data cleaning and Arrow-compatible dataframe processing.
 Updated to include ALL columns for filtering - no restrictions.
 """
+import re
+import hashlib
 import pandas as pd
-import numpy as np
 import streamlit as st
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Optional
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
 
-def clean_dataframe_for_arrow(df: pd.DataFrame) -> pd.DataFrame:
+
+# Rows scanned when collecting sample values for column summaries
+SAMPLE_ROWS = 200
+
+# Characters of text shown per cell in display previews
+DISPLAY_TEXT_WIDTH = 100
+
+# Unique-value lists kept per session for filter widgets
+UNIQUE_VALUES_CACHE_SIZE = 64
+
+# Header tokenizing: split on non-alphanumerics and camelCase boundaries
+_HEADER_SEPARATORS = re.compile(r'[^0-9a-zA-Z]+')
+_CAMEL_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+
+# Placeholder strings treated as missing values when cleaning text columns
+_NA_MAP = {'nan': pd.NA, 'None': pd.NA, '<NA>': pd.NA, 'null': pd.NA}
+
+# Values hidden from filter option lists
+_PLACEHOLDER_VALUES = ['nan', 'None', '', 'null', '<NA>']
+
+
+@lru_cache(maxsize=4096)
+def column_tokens(column: str) -> frozenset:
+    """
+    Split a column header into lower-case word tokens.
+    
+    "Consignee_Name", "consignee name" and "ConsigneeName" all give
+    {"consignee", "name"}, so keyword checks become set intersections
+    and "filename" no longer matches "name".
+    
+    Args:
+        column: Column header
+        
+    Returns:
+        Frozenset of lower-case tokens
+    """
+    words = _CAMEL_BOUNDARY.sub(' ', str(column)).lower()
+    return frozenset(token for token in _HEADER_SEPARATORS.split(words) if token)
+
+
+def clean_dataframe_for_arrow(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
     """
     Clean dataframe to make it Arrow-compatible for Streamlit.
     
     Args:
         df: Input dataframe
+        inplace: Replace columns on df itself; for frames the caller just built
         
     Returns:
         Cleaned dataframe compatible with Arrow serialization
@@ -23,53 +72,148 @@ def clean_dataframe_for_arrow(df: pd.DataFrame) -> pd.DataFrame:
     if df is None or df.empty:
         return df
     
-    # Create a copy to avoid modifying original
-    cleaned_df = df.copy()
-    
-    # Handle object columns
-    for col in cleaned_df.columns:
-        if cleaned_df[col].dtype == 'object':
-            # Try to convert to string, handling None/NaN values
-            try:
-                cleaned_df[col] = cleaned_df[col].astype(str)
-                # Replace 'nan' and 'None' strings with actual NaN
-                cleaned_df[col] = cleaned_df[col].replace(['nan', 'None', '<NA>'], pd.NA)
-            except Exception:
-                # If conversion fails, convert to string and handle nulls
-                cleaned_df[col] = cleaned_df[col].fillna('').astype(str)
-    
-    # Handle mixed numeric columns
-    for col in cleaned_df.columns:
-        if cleaned_df[col].dtype == 'object':
-            # Try to convert to numeric if possible
-            try:
-                # Check if column contains mostly numeric values
-                numeric_converted = pd.to_numeric(cleaned_df[col], errors='coerce')
-                non_null_ratio = numeric_converted.notna().sum() / len(cleaned_df[col])
-                
-                # If more than 80% can be converted to numeric, treat as numeric
-                if non_null_ratio > 0.8:
-                    cleaned_df[col] = numeric_converted
-                else:
-                    # Keep as string but ensure clean strings
-                    cleaned_df[col] = cleaned_df[col].astype(str).replace('nan', '')
-            except Exception:
-                # Fallback: ensure it's a clean string column
-                cleaned_df[col] = cleaned_df[col].astype(str).replace('nan', '')
-    
-    # Handle any remaining object columns that might cause issues
-    for col in cleaned_df.columns:
-        if cleaned_df[col].dtype == 'object':
-            # Force conversion to string and handle special values
-            cleaned_df[col] = (
-                cleaned_df[col]
-                .astype(str)
-                .replace({'nan': '', 'None': '', '<NA>': '', 'null': ''})
-            )
+    # Numeric, boolean and datetime columns are already Arrow-compatible; only object
+    # columns need work, and frames without any are returned as they are
+    object_cols = df.select_dtypes(include='object').columns
+    if len(object_cols) == 0:
+        return df
+    
+    # Rewritten columns are replaced whole, never mutated, so a shallow copy
+    # leaves the original untouched without duplicating the untouched columns
+    cleaned_df = df if inplace else df.copy(deep=False)
+    
+    # Let pandas infer native dtypes for the object columns in one pass first
+    inferred = cleaned_df[object_cols].infer_objects()
+    
+    # One pass per remaining object column: numeric if mostly numeric, otherwise nullable strings
+    for col in object_cols:
+        series = inferred[col]
+        if series.dtype != 'object':
+            # Held real Python numbers, booleans or datetimes
+            cleaned_df[col] = series
+            continue
+        
+        try:
+            numeric_converted = pd.to_numeric(series, errors='coerce')
+            
+            # If more than 80% can be converted to numeric, treat as numeric
+            if numeric_converted.notna().mean() > 0.8:
+                cleaned_df[col] = numeric_converted
+            else:
+                # Nullable strings keep missing values as <NA> instead of 'nan' text
+                cleaned_df[col] = series.astype('string').replace(_NA_MAP)
+        except Exception:
+            # Fallback: ensure it's a clean string column
+            cleaned_df[col] = series.fillna('').astype(str).replace(_NA_MAP)
     
     return cleaned_df
 
 
+def convert_to_arrow_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store text columns as Arrow-backed strings.
+    
+    isin() and unique() on these run as vectorized Arrow kernels instead of
+    Python object comparisons, and the values take roughly half the memory.
+    
+    Args:
+        df: Input dataframe, usually already cleaned for Arrow
+        
+    Returns:
+        Dataframe with object and python-string columns converted to string[pyarrow]
+    """
+    if pa is None or df is None or df.empty:
+        return df
+    
+    object_cols = [
+        col for col in df.select_dtypes(include=['object', 'string']).columns
+        if df[col].dtype != 'string[pyarrow]'
+    ]
+    if len(object_cols) == 0:
+        return df
+    
+    converted_df = df.copy(deep=False)
+    for col in object_cols:
+        try:
+            converted_df[col] = converted_df[col].astype('string[pyarrow]')
+        except (TypeError, ValueError, pa.ArrowException):
+            # Leave columns Arrow cannot represent as plain objects
+            continue
+    
+    return converted_df
+
+
+def to_arrow_preview(df: pd.DataFrame, max_rows: int = 10):
+    """
+    Slice the first rows of a dataframe into an Arrow table for st.dataframe.
+    
+    Streamlit serializes st.dataframe input to Arrow anyway; handing it a
+    table skips that conversion on every rerun.
+    
+    Args:
+        df: Input dataframe
+        max_rows: Number of leading rows to include
+        
+    Returns:
+        pyarrow.Table, or the pandas slice when Arrow cannot convert it
+    """
+    preview = df.head(max_rows)
+    
+    if pa is None:
+        return preview
+    
+    try:
+        return pa.Table.from_pandas(preview, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError):
+        # Mixed-type object columns: let Streamlit apply its own fallback
+        return preview
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> Optional[str]:
+    """
+    Content hash of a dataframe's columns and values, in row order.
+    
+    Args:
+        df: Input dataframe
+        
+    Returns:
+        Hex digest, or None when a column holds unhashable values
+    """
+    try:
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    except TypeError:
+        return None
+    
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update(repr(list(df.columns)).encode())
+    return digest.hexdigest()
+
+
+def _is_arrow_backed(series: pd.Series) -> bool:
+    """Whether a column's values live in an Arrow array."""
+    if pc is None:
+        return False
+    if isinstance(series.dtype, pd.ArrowDtype):
+        return True
+    return isinstance(series.dtype, pd.StringDtype) and str(series.dtype.storage).startswith('pyarrow')
+
+
+def _arrow_sample_values(series: pd.Series, limit: int = 3) -> list:
+    """First distinct non-null values of an Arrow-backed column, cast to strings in C++."""
+    values = pc.drop_null(pa.array(series))
+    return pc.unique(pc.cast(values, pa.string()))[:limit].to_pylist()
+
+
+def _first_type_names(values, limit: int = 2) -> set:
+    """Type names found in values, stopping once limit distinct types are seen."""
+    names = set()
+    for value in values:
+        names.add(type(value).__name__)
+        if len(names) >= limit:
+            break
+    return names
+
+
 def validate_dataframe_columns(df: pd.DataFrame) -> dict:
     """
     Validate dataframe columns and return information about data types.
@@ -86,18 +230,36 @@ def validate_dataframe_columns(df: pd.DataFrame) -> dict:
     column_info = {}
     issues = []
     
+    # Sample values only need the first rows
+    sample = df.head(SAMPLE_ROWS)
+    arrow_cols = [col for col in sample.columns if _is_arrow_backed(sample[col])]
+    
+    # Arrow-backed columns go through Arrow kernels; the rest become strings in one pass
+    other = sample.drop(columns=arrow_cols)
+    other_str = other.astype(str).where(other.notna())
+    samples = {col: other_str[col].dropna().unique()[:3].tolist() for col in other.columns}
+    samples.update({col: _arrow_sample_values(sample[col]) for col in arrow_cols})
+    
+    # Vectorized passes give every column's null and distinct counts at once
+    null_counts = len(df) - df.notna().sum()
+    try:
+        unique_counts = df.nunique(dropna=True)
+    except TypeError:
+        unique_counts = pd.Series({col: _safe_nunique(df[col]) for col in df.columns})
+    dtypes = df.dtypes
+    
     for col in df.columns:
         col_info = {
-            "dtype": str(df[col].dtype),
-            "null_count": df[col].isnull().sum(),
-            "unique_count": df[col].nunique(),
-            "sample_values": df[col].dropna().head(3).tolist()
+            "dtype": str(dtypes[col]),
+            "null_count": null_counts[col],
+            "unique_count": unique_counts[col],
+            "sample_values": samples[col]
         }
         
         # Check for problematic data types
-        if df[col].dtype == 'object':
+        if dtypes[col] == 'object':
             # Check if it contains mixed types
-            sample_types = set(type(x).__name__ for x in df[col].dropna().head(10))
+            sample_types = _first_type_names(sample[col].dropna().head(10))
             if len(sample_types) > 1:
                 issues.append(f"Column '{col}' contains mixed data types: {sample_types}")
                 col_info["mixed_types"] = True
@@ -125,18 +287,26 @@ def safe_dataframe_display(df: pd.DataFrame, max_rows: int = 5) -> pd.DataFrame:
     if df is None or df.empty:
         return df
     
-    # Clean for Arrow compatibility
-    display_df = clean_dataframe_for_arrow(df.head(max_rows))
+    # Clean for Arrow compatibility; the preview rows are copied since their text is rewritten below
+    display_df = clean_dataframe_for_arrow(df.head(max_rows).copy(), inplace=True)
     
     # Additional safety measures for display
     for col in display_df.columns:
-        # Truncate very long strings that might cause display issues
-        if display_df[col].dtype == 'object':
-            display_df[col] = display_df[col].astype(str).str[:100]
+        # Truncate very long strings that might cause display issues; missing values stay missing
+        if display_df[col].dtype == 'object' or pd.api.types.is_string_dtype(display_df[col].dtype):
+            display_df[col] = display_df[col].astype('string').str.slice(stop=DISPLAY_TEXT_WIDTH)
     
     return display_df
 
 
+def _safe_nunique(series: pd.Series) -> int:
+    """Distinct non-null values of a column, or 0 when its values are unhashable."""
+    try:
+        return series.nunique()
+    except TypeError:
+        return 0
+
+
 def get_filterable_columns_safe(df: pd.DataFrame) -> list:
     """
     Get ALL columns suitable for filtering - no restrictions on unique values.
@@ -150,30 +320,15 @@ def get_filterable_columns_safe(df: pd.DataFrame) -> list:
     if df is None or df.empty:
         return []
     
-    filterable_cols = []
+    # One vectorized pass counts the distinct values of every column
+    try:
+        unique_counts = df.nunique(dropna=True)
+    except TypeError:
+        # Unhashable cells in some column: count column by column, skipping failures
+        unique_counts = pd.Series({col: _safe_nunique(df[col]) for col in df.columns})
     
-    for col in df.columns:
-        try:
-            # Include ALL columns except completely empty ones
-            unique_count = df[col].nunique()
-            
-            if unique_count > 0:  # Has at least one unique value
-                # Additional check: ensure the column doesn't have problematic data types
-                if df[col].dtype == 'object':
-                    # Make sure we can convert to string safely
-                    try:
-                        test_values = df[col].dropna().head(5).astype(str)
-                        if len(test_values) > 0:  # Has some non-null values
-                            filterable_cols.append(col)
-                    except Exception:
-                        continue  # Skip this column if conversion fails
-                else:
-                    # Include all numeric columns too
-                    filterable_cols.append(col)
-                    
-        except Exception as e:
-            # Skip columns that cause any issues
-            continue
+    # Include ALL columns except completely empty ones
+    filterable_cols = [col for col in df.columns if unique_counts[col] > 0]
     
     return filterable_cols
 
@@ -182,6 +337,9 @@ def safe_unique_values(df: pd.DataFrame, column: str, max_values: int = 10000) -
     """
     Safely get unique values from a column - increased limit for large datasets.
     
+    Results are memoized in session state until the session's data version
+    changes, so filter widgets don't rescan the column on every rerun.
+    
     Args:
         df: Input dataframe
         column: Column name
@@ -193,52 +351,58 @@ def safe_unique_values(df: pd.DataFrame, column: str, max_values: int = 10000) -
     if df is None or df.empty or column not in df.columns:
         return []
     
+    cache = st.session_state.setdefault('_uv_cache', OrderedDict())
+    key = ('uv', st.session_state.get('_data_version', 0), id(df), column, max_values)
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    
+    values = _compute_unique_values(df, column, max_values)
+    if values is not None:
+        cache[key] = values
+        if len(cache) > UNIQUE_VALUES_CACHE_SIZE:
+            cache.popitem(last=False)
+    
+    return values if values is not None else []
+
+
+def _compute_unique_values(df: pd.DataFrame, column: str, max_values: int) -> Optional[list]:
+    """Sorted string unique values of a column, or None when they cannot be read."""
     try:
+        series = df[column]
+        
         # Get unique values, excluding NaN
-        unique_vals = df[column].dropna().unique()
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # The categories already are the distinct values; no scan needed
+            unique_vals = pd.Series(series.cat.categories)
+        else:
+            unique_vals = pd.Series(series.dropna().unique())
         
         # Allow up to 10000 values for large datasets
-        if len(unique_vals) > max_values:
-            unique_vals = unique_vals[:max_values]
+        unique_vals = unique_vals.iloc[:max_values]
         
-        # Convert to strings safely
-        str_vals = []
-        for val in unique_vals:
-            try:
-                str_val = str(val)
-                if str_val not in ['nan', 'None', '', 'null']:
-                    str_vals.append(str_val)
-            except Exception:
-                continue
+        if pd.api.types.is_numeric_dtype(unique_vals) or pd.api.types.is_datetime64_any_dtype(unique_vals):
+            # Numbers and dates sort by value; no placeholder strings to filter
+            return unique_vals.sort_values().astype(str).tolist()
         
-        return sorted(str_vals)
+        # Text: convert and drop placeholder values in vectorized passes
+        str_vals = unique_vals.astype('string')
+        str_vals = str_vals[str_vals.notna() & ~str_vals.isin(_PLACEHOLDER_VALUES)]
+        return sorted(str_vals.tolist())
         
     except Exception as e:
         st.warning(f"Error getting unique values for column '{column}': {str(e)}")
-        return []
-
-
-@st.cache_data
-def cached_clean_dataframe(df_dict: dict) -> pd.DataFrame:
-    """
-    Cached version of dataframe cleaning.
-    
-    Args:
-        df_dict: Dictionary representation of dataframe
-        
-    Returns:
-        Cleaned dataframe
-    """
-    df = pd.DataFrame(df_dict)
-    return clean_dataframe_for_arrow(df)
+        return None
 
 
-def get_dataframe_info(df: pd.DataFrame) -> dict:
+def get_dataframe_info(df: pd.DataFrame, deep: bool = False) -> dict:
     """
     Get comprehensive information about a dataframe.
     
     Args:
         df: Input dataframe
+        deep: Measure every Python object in object columns instead of
+            counting their pointers (a full scan of the data)
         
     Returns:
         Dictionary with dataframe statistics
@@ -246,7 +410,7 @@ def get_dataframe_info(df: pd.DataFrame) -> dict:
     if df is None or df.empty:
         return {"rows": 0, "columns": 0, "memory_usage": 0}
     
-    memory_usage = df.memory_usage(deep=True).sum()
+    memory_usage = df.memory_usage(deep=deep).sum()
     
     return {
         "rows": len(df),
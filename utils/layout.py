@@ -4,7 +4,32 @@ Layout Utilities
 UI layout and styling utilities for the Streamlit application.
 """
 import streamlit as st
+from functools import lru_cache
 from typing import Dict, Any
+from utils.data_utils import to_arrow_preview
+from utils.winwood_styling import WINWOOD_THEME_CSS
+
+
+@lru_cache(maxsize=1)
+def _state_backend():
+    """Resolve (get_state, go_to_stage) once per process; None if the modules are missing."""
+    try:
+        from state_management import get_state
+        from controllers import go_to_stage
+    except ImportError:
+        return None
+    return get_state, go_to_stage
+
+
+def navigate_to_stage(stage: str):
+    """Navigate to a stage, falling back to raw session state without the controllers."""
+    backend = _state_backend()
+    if backend is None:
+        st.session_state.current_stage = stage
+        st.rerun()
+    else:
+        _, go_to_stage = backend
+        go_to_stage(stage)
 
 
 def setup_page_config():
@@ -17,6 +42,28 @@ def setup_page_config():
     )
 
 
+# Sidebar navigation entries: stage -> label
+_NAV_LABELS = {
+    "upload": "📤 Upload Data",
+    "map": "🔍 Web Research",
+    "analyze": "📧 Email Outreach",
+}
+
+
+def _on_navigation_change():
+    """Radio callback: switch stage before the rerun the widget change already triggers."""
+    stage = st.session_state.get("_nav")
+    if stage is None:
+        return
+    
+    backend = _state_backend()
+    if backend is None:
+        st.session_state.current_stage = stage
+    else:
+        get_state, _ = backend
+        get_state().current_stage = stage
+
+
 def render_navigation_sidebar():
     """Render the navigation sidebar."""
     with st.sidebar:
@@ -27,43 +74,33 @@ def render_navigation_sidebar():
         st.subheader("Navigation")
         
         # Get current stage from session state
-        try:
-            from state_management import get_state
-            state = get_state()
-            current_stage = state.current_stage
-        except:
-            current_stage = "upload"
+        backend = _state_backend()
+        if backend:
+            current_stage = backend[0]().current_stage
+        else:
+            current_stage = st.session_state.get("current_stage", "upload")
         
-        # Navigation buttons
-        if st.button("📤 Upload Data", use_container_width=True):
-            try:
-                from controllers import go_to_stage
-                go_to_stage("upload")
-            except:
-                st.session_state.current_stage = "upload"
-                st.rerun()
+        # Keep the selection in step with navigation done elsewhere; stages outside
+        # the menu leave it unselected
+        selected = current_stage if current_stage in _NAV_LABELS else None
+        if st.session_state.get("_nav") != selected:
+            st.session_state["_nav"] = selected
         
-        if st.button("🔍 Web Research", use_container_width=True):
-            try:
-                from controllers import go_to_stage
-                go_to_stage("map")
-            except:
-                st.session_state.current_stage = "map"
-                st.rerun()
-        
-        if st.button("📧 Email Outreach", use_container_width=True):
-            try:
-                from controllers import go_to_stage
-                go_to_stage("analyze")
-            except:
-                st.session_state.current_stage = "analyze"
-                st.rerun()
+        # One radio widget instead of a button per stage
+        st.radio(
+            "Go to",
+            options=list(_NAV_LABELS),
+            format_func=_NAV_LABELS.get,
+            key="_nav",
+            on_change=_on_navigation_change,
+            label_visibility="collapsed"
+        )
 
 
 def render_progress_indicator():
     """Render progress indicator."""
     try:
-        from state_management import get_state
+        get_state, _ = _state_backend()
         state = get_state()
         progress = state.stage_progress
         
@@ -149,7 +186,8 @@ def render_data_summary(df):
             st.metric("Columns", len(df.columns))
         
         with col3:
-            memory_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
+            # Shallow sizing is O(columns); Arrow-backed text columns still report their buffers
+            memory_mb = df.memory_usage(deep=False).sum() / 1024 / 1024
             st.metric("Memory", f"{memory_mb:.1f} MB")
 
 
@@ -198,7 +236,7 @@ def render_dataframe_preview(df, title: str = "Data Preview", max_rows: int = 5)
         render_data_summary(df)
         
         # Show preview
-        st.dataframe(df.head(max_rows), use_container_width=True)
+        st.dataframe(to_arrow_preview(df, max_rows), use_container_width=True)
         
         if len(df) > max_rows:
             st.caption(f"Showing first {max_rows} rows of {len(df)} total rows")
@@ -217,46 +255,50 @@ def create_results_section():
 
 
 # Styling utilities
+_CUSTOM_CSS = """
+.main > div {
+    padding-top: 2rem;
+}
+
+.stButton > button {
+    width: 100%;
+}
+
+.metric-container {
+    background-color: #f0f2f6;
+    padding: 1rem;
+    border-radius: 0.5rem;
+    margin: 0.5rem 0;
+}
+
+.success-message {
+    background-color: #d4edda;
+    color: #155724;
+    padding: 0.75rem;
+    border-radius: 0.25rem;
+    border: 1px solid #c3e6cb;
+}
+
+.error-message {
+    background-color: #f8d7da;
+    color: #721c24;
+    padding: 0.75rem;
+    border-radius: 0.25rem;
+    border: 1px solid #f5c6cb;
+}
+"""
+
+# Layout and theme rules joined once at import and emitted as a single element
+_COMBINED_CSS = f"<style>{_CUSTOM_CSS}{WINWOOD_THEME_CSS}</style>"
+
+
 def apply_custom_css():
-    """Apply custom CSS styling."""
-    st.markdown("""
-    <style>
-    .main > div {
-        padding-top: 2rem;
-    }
-    
-    .stButton > button {
-        width: 100%;
-    }
-    
-    .metric-container {
-        background-color: #f0f2f6;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 0.5rem 0;
-    }
-    
-    .success-message {
-        background-color: #d4edda;
-        color: #155724;
-        padding: 0.75rem;
-        border-radius: 0.25rem;
-        border: 1px solid #c3e6cb;
-    }
-    
-    .error-message {
-        background-color: #f8d7da;
-        color: #721c24;
-        padding: 0.75rem;
-        border-radius: 0.25rem;
-        border: 1px solid #f5c6cb;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    """Apply custom CSS styling, including the Winwood theme rules."""
+    st.markdown(_COMBINED_CSS, unsafe_allow_html=True)
 
 
 # Initialize layout
 def initialize_layout():
-    """Initialize the application layout."""
+    """Initialize the application layout: page config and the single app stylesheet."""
     setup_page_config()
     apply_custom_css()